@@ -1,43 +1,90 @@
-def solve_part1():
-    # Read the input file and split into two lists
-    with open('Data/1.txt') as f:
-        left_nums = []
-        right_nums = []
-        for line in f:
-            left, right = map(int, line.strip().split())
-            left_nums.append(left)
-            right_nums.append(right)
-    
-    # Sort both lists
-    left_nums.sort()
-    right_nums.sort()
-    
-    # Calculate total distance
-    total_distance = sum(abs(l - r) for l, r in zip(left_nums, right_nums))
-    
-    return total_distance
-
-def solve_part2():
-    # Read the input file and split into two lists
-    with open('Data/1.txt') as f:
-        left_nums = []
-        right_nums = []
-        for line in f:
-            left, right = map(int, line.strip().split())
-            left_nums.append(left)
-            right_nums.append(right)
-    
-    # Count occurrences in right list
-    right_counts = {}
-    for num in right_nums:
-        right_counts[num] = right_counts.get(num, 0) + 1
-    
-    # Calculate similarity score
-    total_score = sum(num * right_counts.get(num, 0) for num in left_nums)
-    
-    return total_score
-
-print(solve_part1())
-print(solve_part2())
+from PY_utils import Parser
+from typing import Iterable, Tuple
+import sys
+import numpy as np
 
+def load_lists(day: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse the input once into the left and right int64 columns"""
+    parser = Parser()
+    columns = parser.int_columns(parser.load_bytes(day), ncols=2)
+    return columns[:, 0], columns[:, 1]
 
+def total_distance(left: np.ndarray, right: np.ndarray) -> int:
+    """Sum of |l - r| after pairing both lists in sorted order"""
+    return int(np.abs(np.sort(left) - np.sort(right)).sum())
+
+def similarity_score(left: np.ndarray, right: np.ndarray) -> int:
+    """Sum of each left value times how often it appears on the right"""
+    values, counts = np.unique(right, return_counts=True)
+    pos = np.minimum(np.searchsorted(values, left), len(values) - 1)
+    hit = values[pos] == left
+    return int((left[hit] * counts[pos[hit]]).sum())
+
+# Streaming mode: both answers only depend on how often each value occurs,
+# so each block is reduced to sorted (value, count) runs and merged into a
+# running table - an external sort in run-length form whose memory is
+# bounded by the number of distinct values rather than rows.
+
+def merge_counts(values: np.ndarray, counts: np.ndarray,
+                 new_values: np.ndarray, new_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge two sorted (value, count) tables"""
+    merged, inverse = np.unique(np.concatenate([values, new_values]), return_inverse=True)
+    totals = np.zeros(len(merged), dtype=np.int64)
+    np.add.at(totals, inverse, np.concatenate([counts, new_counts]))
+    return merged, totals
+
+def stream_counts(blocks: Iterable[np.ndarray]) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    """Fold (m, 2) blocks into sorted (value, count) tables per column"""
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    left, right = empty, empty
+    for block in blocks:
+        left = merge_counts(*left, *np.unique(block[:, 0], return_counts=True))
+        right = merge_counts(*right, *np.unique(block[:, 1], return_counts=True))
+    return left, right
+
+def total_distance_from_counts(left: Tuple[np.ndarray, np.ndarray],
+                               right: Tuple[np.ndarray, np.ndarray]) -> int:
+    """Sorted-pair L1 distance from value counts
+
+    Pairing sorted lists rank by rank, sum |l_i - r_i| equals the area
+    between the two cumulative counts: sum over t of |#left <= t - #right <= t|.
+    """
+    (lv, lc), (rv, rc) = left, right
+    if lc.sum() != rc.sum():
+        raise ValueError("Lists have different lengths")
+    points = np.union1d(lv, rv)
+    left_cdf = np.zeros(len(points), dtype=np.int64)
+    right_cdf = np.zeros(len(points), dtype=np.int64)
+    left_cdf[np.searchsorted(points, lv)] = lc
+    right_cdf[np.searchsorted(points, rv)] = rc
+    gaps = np.diff(points)
+    return int((np.abs(np.cumsum(left_cdf) - np.cumsum(right_cdf))[:-1] * gaps).sum())
+
+def similarity_from_counts(left: Tuple[np.ndarray, np.ndarray],
+                           right: Tuple[np.ndarray, np.ndarray]) -> int:
+    """Similarity score from value counts"""
+    (lv, lc), (rv, rc) = left, right
+    common, li, ri = np.intersect1d(lv, rv, assume_unique=True, return_indices=True)
+    return int((common * lc[li] * rc[ri]).sum())
+
+def solve(day: int = 1, stream: bool = False) -> Tuple[int, int]:
+    """Both parts from a single pass over the input"""
+    if stream:
+        left, right = stream_counts(Parser().iter_int_columns(day, ncols=2))
+        return total_distance_from_counts(left, right), similarity_from_counts(left, right)
+    left, right = load_lists(day)
+    return total_distance(left, right), similarity_score(left, right)
+
+def test_solution():
+    left = np.array([3, 4, 2, 1, 3, 3])
+    right = np.array([4, 3, 5, 3, 9, 3])
+    assert (total_distance(left, right), similarity_score(left, right)) == (11, 31)
+    counts = stream_counts([np.column_stack([left[:4], right[:4]]), np.column_stack([left[4:], right[4:]])])
+    assert (total_distance_from_counts(*counts), similarity_from_counts(*counts)) == (11, 31)
+    print("✓ Passed: 11, 31")
+
+if __name__ == "__main__":
+    #test_solution()
+    part1, part2 = solve(stream='--stream' in sys.argv)
+    print(part1)
+    print(part2)
@@ -1,5 +1,7 @@
 import re
 from itertools import count
+from pathlib import Path
+from PY_utils import Parser
 
 def parse_input(puzzle_input):
     """Parse the input data, filtering out invalid or blank lines."""
@@ -15,23 +17,20 @@ def load_robots(filename):
     Returns a list of (x, y, dx, dy).
     """
     robots = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            # Example line: p=0,4 v=3,-3
-            # We'll parse it out:
-            parts = line.split()
-            # parts[0] should be like p=0,4
-            # parts[1] should be like v=3,-3
-            pos_str = parts[0][2:]  # remove 'p='
-            vel_str = parts[1][2:]  # remove 'v='
-            x_str, y_str = pos_str.split(',')
-            dx_str, dy_str = vel_str.split(',')
-            x, y = int(x_str), int(y_str)
-            dx, dy = int(dx_str), int(dy_str)
-            robots.append((x, y, dx, dy))
+    # Stream the file; blank lines are skipped and lines come back stripped
+    for line in Parser().iter_lines(Path(filename)):
+        # Example line: p=0,4 v=3,-3
+        # We'll parse it out:
+        parts = line.split()
+        # parts[0] should be like p=0,4
+        # parts[1] should be like v=3,-3
+        pos_str = parts[0][2:]  # remove 'p='
+        vel_str = parts[1][2:]  # remove 'v='
+        x_str, y_str = pos_str.split(',')
+        dx_str, dy_str = vel_str.split(',')
+        x, y = int(x_str), int(y_str)
+        dx, dy = int(dx_str), int(dy_str)
+        robots.append((x, y, dx, dy))
     return robots
 
 def step_robots(robots, width, height, steps=1):
@@ -1,51 +1,68 @@
+from PY_utils import Parser
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple, Union
+import io
+import mmap
 import re
 
-def parse_input():
-    with open('Data/3.txt', 'r') as file:
-        return file.read().strip()
-
-def solve_part1(data):
-    # Find all valid mul(X,Y) patterns where X and Y are 1-3 digits
-    pattern = r'mul\((\d{1,3}),(\d{1,3})\)'
-    matches = re.finditer(pattern, data)
-    
-    total = 0
-    for match in matches:
-        x, y = map(int, match.groups())
-        total += x * y
-    
-    return total
-
-def solve_part2(data):
-    # Find all mul instructions and do/don't controls
-    mul_pattern = r'mul\((\d{1,3}),(\d{1,3})\)'
-    control_pattern = r'do\(\)|don\'t\(\)'
-    
-    # Get all matches with their positions
-    mul_matches = [(m.start(), m) for m in re.finditer(mul_pattern, data)]
-    control_matches = [(m.start(), m.group()) for m in re.finditer(control_pattern, data)]
-    
-    # Combine and sort all matches by position
-    all_matches = mul_matches + control_matches
-    all_matches.sort()
-    
+# One alternation in input order: group 1/2 are mul operands, group 3 is
+# do(), group 4 is don't(); `lastindex` says which one matched.
+INSTRUCTION = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))")
+MUL, DO, DONT = 2, 3, 4
+LONGEST = len(b"mul(999,999)")
+
+def parse_input() -> str:
+    return Parser().load_file(3)
+
+def iter_chunks(source: Union[int, Path] = 3, chunk_size: int = 1 << 24) -> Iterator[bytes]:
+    """Fixed-size chunks of an input; plain files are memory-mapped and
+    gzip/zstd dumps are decompressed on the fly"""
+    with Parser().open_input(source) as stream:
+        if type(stream) is io.BufferedReader and Path(stream.name).stat().st_size:
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), chunk_size):
+                    yield mm[start:start + chunk_size]
+            return
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            yield chunk
+
+def scan(chunks: Iterable[bytes]) -> Tuple[int, int]:
+    """Sum of all mul products (part 1) and of enabled ones (part 2) in one pass
+
+    Instructions can straddle chunk boundaries: after each chunk only the
+    unmatched tail that could still start an instruction (at most
+    LONGEST - 1 bytes) is carried over. Every instruction ends in ')' and
+    none can contain another, so a match found in the buffer is final.
+    """
     enabled = True
-    total = 0
-    
-    for pos, match in all_matches:
-        if isinstance(match, str):  # Control instruction
-            enabled = match == 'do()'
-        else:  # Multiplication instruction
-            if enabled:
-                x, y = map(int, match.groups())
-                total += x * y
-    
-    return total
+    part1 = part2 = 0
+    carry = b''
+    for chunk in chunks:
+        buffer = carry + chunk
+        end = 0
+        for match in INSTRUCTION.finditer(buffer):
+            kind = match.lastindex
+            if kind == MUL:
+                product = int(match[1]) * int(match[2])
+                part1 += product
+                if enabled:
+                    part2 += product
+            else:
+                enabled = kind == DO
+            end = match.end()
+        carry = buffer[max(end, len(buffer) - LONGEST + 1):]
+    return part1, part2
+
+def solve_part1(data: str) -> int:
+    return scan([data.encode()])[0]
+
+def solve_part2(data: str) -> int:
+    return scan([data.encode()])[1]
 
 def main():
-    data = parse_input()
-    print(f"Part 1: {solve_part1(data)}")
-    print(f"Part 2: {solve_part2(data)}")
+    part1, part2 = scan(iter_chunks())
+    print(f"Part 1: {part1}")
+    print(f"Part 2: {part2}")
 
 if __name__ == "__main__":
     main()
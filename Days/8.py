@@ -1,13 +1,7 @@
-from collections import defaultdict
-from dataclasses import dataclass
+from PY_utils import Parser
 from pathlib import Path
-from typing import List, Set, Dict, Tuple
-
-
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
+from typing import Dict, List, Union
+import numpy as np
 
 
 def read_file(file_path: str) -> str:
@@ -15,110 +9,96 @@ def read_file(file_path: str) -> str:
     return Path(file_path).read_text(encoding="utf-8")
 
 
-def parse_input(advent_input: str) -> List[List[str]]:
+def parse_input(advent_input: str) -> np.ndarray:
     """Parse input string into a grid of antenna frequencies."""
-    return [list(line) for line in advent_input.strip().splitlines()]
+    return Parser().parse_grid(advent_input.strip(), as_type=str)
+
+
+def find_antennas(grid: Union[np.ndarray, List[List[str]]]) -> Dict[str, np.ndarray]:
+    """Group antenna (y, x) positions by frequency, as (k, 2) arrays."""
+    grid = np.asarray(grid)
+    ys, xs = np.nonzero(grid != '.')
+    frequencies, groups = np.unique(grid[ys, xs], return_inverse=True)
+    positions = np.column_stack([ys, xs])
+    order = np.argsort(groups, kind='stable')
+    bounds = np.searchsorted(groups[order], np.arange(len(frequencies) + 1))
+    return {str(f): positions[order[bounds[i]:bounds[i + 1]]] for i, f in enumerate(frequencies)}
 
 
-def find_antennas(grid: List[List[str]]) -> Dict[str, List[Point]]:
-    """Find all antennas and group them by frequency."""
-    antennas = defaultdict(list)
-    for y, row in enumerate(grid):
-        for x, char in enumerate(row):
-            if char != '.':
-                antennas[char].append(Point(x, y))
-    return antennas
+def mark(occupied: np.ndarray, cells: np.ndarray) -> None:
+    """Set every in-bounds (y, x) of cells in the occupancy grid."""
+    height, width = occupied.shape
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < height) & (cells[:, 1] >= 0) & (cells[:, 1] < width)
+    occupied[cells[inside, 0], cells[inside, 1]] = True
 
 
-def is_collinear(p1: Point, p2: Point, p3: Point) -> bool:
-    """Check if three points are collinear."""
-    # Using the cross product method
-    return (p2.y - p1.y) * (p3.x - p1.x) == (p3.y - p1.y) * (p2.x - p1.x)
+def step_range(start: np.ndarray, step: np.ndarray, size: int) -> np.ndarray:
+    """Per pair, the (lo, hi) multiples t keeping start + t * step in [0, size)."""
+    big = np.iinfo(np.int64).max // 4
+    safe = np.where(step == 0, 1, step)
+    first = -((start - np.where(step > 0, 0, size - 1)) // safe)  # ceil division
+    last = (np.where(step > 0, size - 1, 0) - start) // safe
+    return np.where(step == 0, -big, first), np.where(step == 0, big, last)
 
 
-def solve_part1(grid: List[List[str]]) -> int:
+def antinode_grid(grid: Union[np.ndarray, List[List[str]]], resonant: bool = False) -> np.ndarray:
+    """Boolean grid of antinodes, computed pair-wise in exact integers.
+
+    Without `resonant`, antinodes are the points on a pair's line where one
+    antenna is twice as far as the other: beyond each end, and at the two
+    trisection points when they fall on the grid. With `resonant`, every
+    grid point on the line counts; the line is walked in steps of
+    (dy, dx) / gcd(dy, dx) so O(pairs x line length) cells are touched.
+    """
+    grid = np.asarray(grid)
+    height, width = grid.shape
+    occupied = np.zeros((height, width), dtype=bool)
+    for points in find_antennas(grid).values():
+        if len(points) < 2:
+            continue
+        i, j = np.triu_indices(len(points), 1)
+        start, delta = points[i], points[j] - points[i]
+        if not resonant:
+            mark(occupied, start - delta)
+            mark(occupied, points[j] + delta)
+            thirds = (delta % 3 == 0).all(axis=1)
+            mark(occupied, start[thirds] + delta[thirds] // 3)
+            mark(occupied, start[thirds] + 2 * (delta[thirds] // 3))
+            continue
+        step = delta // np.gcd(delta[:, 0], delta[:, 1])[:, None]
+        lo_y, hi_y = step_range(start[:, 0], step[:, 0], height)
+        lo_x, hi_x = step_range(start[:, 1], step[:, 1], width)
+        lo, hi = np.maximum(lo_y, lo_x), np.minimum(hi_y, hi_x)
+        counts = hi - lo + 1
+        # All multiples lo..hi of every pair's step, as one flat array
+        pair = np.repeat(np.arange(len(start)), counts)
+        t = lo[pair] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        occupied[tuple((start[pair] + t[:, None] * step[pair]).T)] = True
+    return occupied
+
+
+def solve_part1(grid: Union[np.ndarray, List[List[str]]]) -> int:
     """
     Find antinodes where one antenna is twice as far from the antinode
     as the other antenna (of the same frequency).
     """
-    height = len(grid)
-    width = len(grid[0])
-    antennas = find_antennas(grid)
-    antinodes = set()
+    return int(antinode_grid(grid).sum())
 
-    for frequency, points in antennas.items():
-        if len(points) < 2:
-            continue
-            
-        # Check each pair of antennas
-        for i, p1 in enumerate(points):
-            for p2 in points[i+1:]:
-                # Calculate the vector between antennas
-                dx = p2.x - p1.x
-                dy = p2.y - p1.y
-                
-                # Calculate the unit vector (direction)
-                length = (dx * dx + dy * dy) ** 0.5
-                if length == 0:
-                    continue
-                    
-                udx = dx / length
-                udy = dy / length
-                
-                # Try points at various distances along the line
-                for dist in range(-max(width, height), max(width, height)):
-                    # Try both directions from each antenna
-                    for antenna, direction in [(p1, 1), (p2, -1)]:
-                        x = int(antenna.x + direction * dist * udx)
-                        y = int(antenna.y + direction * dist * udy)
-                        
-                        if 0 <= x < width and 0 <= y < height:
-                            point = Point(x, y)
-                            dist1 = (point.x - p1.x) ** 2 + (point.y - p1.y) ** 2
-                            dist2 = (point.x - p2.x) ** 2 + (point.y - p2.y) ** 2
-                            
-                            if dist1 > 0 and dist2 > 0:  # Avoid division by zero
-                                ratio = dist1 / dist2
-                                if abs(ratio - 2.0) < 0.1 or abs(ratio - 0.5) < 0.1:
-                                    antinodes.add(point)
-
-    return len(antinodes)
-
-
-def solve_part2(grid: List[List[str]]) -> int:
+
+def solve_part2(grid: Union[np.ndarray, List[List[str]]]) -> int:
     """
     Find antinodes at any point collinear with two antennas 
     of the same frequency.
     """
-    height = len(grid)
-    width = len(grid[0])
-    antennas = find_antennas(grid)
-    antinodes = set()
-
-    for frequency, points in antennas.items():
-        if len(points) < 2:
-            continue
-            
-        # Check each pair of antennas
-        for i, p1 in enumerate(points):
-            for j, p2 in enumerate(points[i+1:], i+1):
-                # Check all points in the grid for collinearity
-                for y in range(height):
-                    for x in range(width):
-                        p = Point(x, y)
-                        if is_collinear(p1, p2, p):
-                            antinodes.add(p)
-
-    return len(antinodes)
+    return int(antinode_grid(grid, resonant=True).sum())
 
 
 def main():
-    file_input = read_file("Data/8.txt")
-    grid = parse_input(file_input)
+    grid = parse_input(Parser().load_file(8))
     
     print(f"Part 1: {solve_part1(grid)}")
     print(f"Part 2: {solve_part2(grid)}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
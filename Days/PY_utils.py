@@ -1,135 +1,1606 @@
 import numpy as np
-from numba import jit, cuda
-import multiprocessing as mp
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Set, Tuple, Dict, Any, Optional, Callable, Generator, TypeVar
+import weakref
+import array as pyarray
+from bisect import bisect_left, bisect_right
+import contextlib
+import copy
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import queue
+import threading
+from typing import List, Set, Tuple, Dict, Any, Optional, Callable, Generator, TypeVar, Iterable, Iterator
 from dataclasses import dataclass
-from collections import defaultdict, deque
+from collections import defaultdict, OrderedDict
+from types import MappingProxyType
 import heapq
-import networkx as nx
-from scipy.spatial import ConvexHull
+import importlib
 import itertools
-from functools import lru_cache, partial
+from functools import lru_cache, partial, update_wrapper
 import re
 from pathlib import Path
-from typing import List, Dict, Set, Any, Optional, Union, Pattern
+from typing import List, Dict, Set, Any, Optional, Union, Pattern, Hashable, Mapping, BinaryIO, ContextManager
 
 T = TypeVar('T')  # Generic type for flexible typing
 
+# Heavy backends (numba, scipy, networkx, multiprocessing pools) are only
+# imported on first use so that e.g. `from PY_utils import Parser` stays cheap.
+_LAZY_ATTRIBUTES = {
+    'mp': ('multiprocessing', None),
+    'cuda': ('numba.cuda', None),
+    'nx': ('networkx', None),
+    'ConvexHull': ('scipy.spatial', 'ConvexHull'),
+    'ThreadPoolExecutor': ('concurrent.futures', 'ThreadPoolExecutor'),
+}
+
+def __getattr__(name: str) -> Any:
+    """Resolve lazily imported backends on first access as module attributes"""
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+@lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    from numba import cuda
+    return cuda.is_available()
+
+class _LazyJit:
+    """Numba-compiled function that imports numba and compiles on first call
+
+    Other lazily jitted helpers it refers to are compiled first and swapped
+    into the module namespace, so numba sees real dispatchers when it
+    resolves globals (`prange` is bound to `numba.prange` the same way).
+    Compiled code is cached on disk (`cache=True`).
+    """
+    def __init__(self, func: Callable, options: Dict[str, Any]):
+        update_wrapper(self, func)
+        self.func = func
+        self.options = options
+        self._dispatcher = None
+
+    def compiled(self) -> Callable:
+        if self._dispatcher is None:
+            import numba
+            namespace = self.func.__globals__
+            namespace.setdefault('prange', numba.prange)
+            for name in self.func.__code__.co_names:
+                dependency = namespace.get(name)
+                if isinstance(dependency, _LazyJit):
+                    namespace[name] = dependency.compiled()
+            self._dispatcher = numba.jit(**self.options)(self.func)
+            if namespace.get(self.func.__name__) is self:
+                namespace[self.func.__name__] = self._dispatcher
+        return self._dispatcher
+
+    def __call__(self, *args, **kwargs):
+        return self.compiled()(*args, **kwargs)
+
+def jit(func: Optional[Callable] = None, **options) -> Union[_LazyJit, Callable]:
+    """Drop-in for `numba.jit` that defers import and compilation to first use"""
+    options.setdefault('cache', True)
+    if func is None:
+        return partial(jit, **options)
+    return _LazyJit(func, options)
+
+def _chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items"""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _apply_chunk(func: Callable, chunk: List[Any]) -> List[Any]:
+    """Worker-side helper: apply func to every item of a chunk"""
+    return [func(item) for item in chunk]
+
+@dataclass(frozen=True)
+class SharedArrayHandle:
+    """Picklable reference to an array published in shared memory"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+class SharedArray:
+    """Read-only NumPy array published once through multiprocessing.shared_memory
+
+    Only the small `handle` travels to workers; they attach to the same
+    physical pages, so the input is copied once no matter how many workers
+    or chunks consume it. The publishing process owns the segment and must
+    `close()` it (or use it as a context manager).
+    """
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError("Object arrays cannot be placed in shared memory")
+        from multiprocessing import shared_memory
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        self.array[...] = array
+        self.array.flags.writeable = False
+        self.handle = SharedArrayHandle(self._shm.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release and unlink the shared segment"""
+        if self._shm is None:
+            return
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # A caller still holds a view; the mapping dies with it
+        self._shm.unlink()
+        self._shm = None
+
+_ATTACHED_LIMIT = 32
+_attached: Dict[str, Tuple[Any, np.ndarray]] = {}
+
+def _detach(name: str):
+    """Worker-side: drop an attachment and unmap its segment"""
+    shm = _attached.pop(name)[0]  # the cached array view goes with the entry
+    try:
+        shm.close()
+    except BufferError:
+        pass  # a caller still holds a view; the mapping dies with it
+
+def _attach(handle: SharedArrayHandle) -> np.ndarray:
+    """Worker-side: map a published array, reusing earlier attachments"""
+    entry = _attached.get(handle.name)
+    if entry is None:
+        if len(_attached) >= _ATTACHED_LIMIT:
+            _detach(next(iter(_attached)))
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=handle.name)
+        array = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        entry = _attached[handle.name] = (shm, array)
+    return entry[1]
+
+def _release_stale(keep: Iterable[str]):
+    """Worker-side: unmap attachments not used by the current call
+
+    The parent unlinks a segment when its call ends, but the memory is only
+    freed once every mapping is gone, so workers drop earlier calls'
+    segments as soon as they see a task from a different call.
+    """
+    keep = set(keep)
+    for name in [name for name in _attached if name not in keep]:
+        _detach(name)
+
+def _call_with_shared(func: Callable, handles: Dict[str, SharedArrayHandle], item: Any) -> Any:
+    """Worker-side: resolve shared handles and call func(arrays, item)"""
+    _release_stale(h.name for h in handles.values())
+    return func({key: _attach(h) for key, h in handles.items()}, item)
+
 class ParallelProcessor:
-    """Manages parallel processing resources efficiently"""
-    def __init__(self, max_workers: Optional[int] = None, use_gpu: bool = False):
-        self.max_workers = max_workers or mp.cpu_count()
-        self.use_gpu = use_gpu and cuda.is_available()
+    """Manages parallel processing resources efficiently
+
+    Workers are started lazily on first use. A persistent processor keeps its
+    pool warm across `with` blocks and is only torn down by `shutdown()`,
+    when the processor is garbage-collected, or at interpreter exit.
+    """
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 use_gpu: bool = False,
+                 persistent: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_gpu = use_gpu and _cuda_available()
+        self.persistent = persistent
         self._pool = None
         self._executor = None
-    
+        self._lock = threading.Lock()
+        self._pool_finalizer = None
+
     def __enter__(self):
-        self._pool = mp.Pool(self.max_workers)
-        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._ensure_pool()
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._pool:
-            self._pool.close()
-            self._pool.join()
-        if self._executor:
-            self._executor.shutdown()
-
-    def map(self, func: Callable, iterable: List[Any], chunk_size: Optional[int] = None) -> List[Any]:
-        """Parallel map with automatic chunking"""
+        if not self.persistent:
+            self.shutdown()
+
+    def _ensure_pool(self):
+        """Start the worker pool if it is not already running"""
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing as mp
+                from multiprocessing import resource_tracker
+                if os.name == 'posix':
+                    # Share one tracker with the workers so attaching to a
+                    # SharedArray is not reported as a leak by each worker
+                    resource_tracker.ensure_running()
+                self._pool = mp.Pool(self.max_workers)
+                # Holds the pool, not the processor, so dropping the last
+                # reference to the processor still stops its workers
+                self._pool_finalizer = weakref.finalize(self, self._pool.terminate)
+            return self._pool
+
+    @property
+    def executor(self) -> 'ThreadPoolExecutor':
+        """Lazily created thread pool for I/O bound work"""
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def shutdown(self, wait: bool = True):
+        """Explicitly stop the worker pool and thread executor"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            executor, self._executor = self._executor, None
+            if self._pool_finalizer is not None:
+                self._pool_finalizer.detach()
+                self._pool_finalizer = None
+        if pool:
+            pool.close()
+            if wait:
+                pool.join()
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def map(self,
+            func: Callable,
+            iterable: Iterable[Any],
+            chunk_size: Optional[int] = None,
+            max_in_flight: Optional[int] = None) -> List[Any]:
+        """Parallel map with automatic chunking
+
+        With `max_in_flight` the input is consumed lazily and at most that
+        many chunks are queued or buffered at once.
+        """
         if self.use_gpu and hasattr(func, 'cuda_kernel'):
             return func.cuda_kernel(iterable)
-        return self._pool.map(func, iterable, chunksize=chunk_size)
+        if max_in_flight is None:
+            return self._ensure_pool().map(func, iterable, chunksize=chunk_size)
+        return list(self._stream(func, iterable, chunk_size or 1, max_in_flight, ordered=True))
+
+    def map_shared(self,
+                   func: Callable[[Dict[str, np.ndarray], Any], Any],
+                   shared: Dict[str, Union[np.ndarray, SharedArray]],
+                   iterable: Iterable[Any],
+                   chunk_size: Optional[int] = None,
+                   max_in_flight: Optional[int] = None) -> List[Any]:
+        """Parallel map over small items against large read-only arrays
+
+        `func` must be a module-level function called as `func(arrays, item)`.
+        Plain arrays in `shared` are published for the duration of the call;
+        pass `SharedArray` instances to reuse a publication across calls.
+        """
+        # Fork the workers first so they do not inherit a mapping of the
+        # segments below, which would outlive the call
+        self._ensure_pool()
+        owned = {key: SharedArray(value) for key, value in shared.items()
+                 if not isinstance(value, SharedArray)}
+        try:
+            handles = {key: (owned[key] if key in owned else value).handle
+                       for key, value in shared.items()}
+            task = partial(_call_with_shared, func, handles)
+            return self.map(task, iterable, chunk_size, max_in_flight)
+        finally:
+            for array in owned.values():
+                array.close()
+
+    def imap_unordered(self,
+                       func: Callable,
+                       iterable: Iterable[Any],
+                       chunk_size: int = 1,
+                       max_in_flight: Optional[int] = None) -> Iterator[Any]:
+        """Stream results as soon as workers finish them, in completion order
+
+        At most `max_in_flight` chunks (default: 2 per worker) are submitted
+        but not yet yielded, so arbitrarily long inputs run in bounded memory.
+        """
+        return self._stream(func, iterable, chunk_size, max_in_flight, ordered=False)
+
+    def _stream(self,
+                func: Callable,
+                iterable: Iterable[Any],
+                chunk_size: int,
+                max_in_flight: Optional[int],
+                ordered: bool) -> Iterator[Any]:
+        """Submit chunks with bounded backpressure and yield their results"""
+        pool = self._ensure_pool()
+        limit = max(1, max_in_flight or 2 * self.max_workers)
+        done: queue.Queue = queue.Queue()
+        buffered: Dict[int, List[Any]] = {}
+        pending = 0
+        next_index = 0
+
+        def submit(index: int, chunk: List[Any]):
+            pool.apply_async(_apply_chunk, (func, chunk),
+                             callback=lambda r: done.put((index, r, None)),
+                             error_callback=lambda e: done.put((index, None, e)))
+
+        def collect() -> Iterator[Any]:
+            nonlocal pending, next_index
+            index, result, error = done.get()
+            if error is not None:
+                raise error
+            if not ordered:
+                pending -= 1
+                yield from result
+                return
+            buffered[index] = result
+            while next_index in buffered:
+                pending -= 1
+                yield from buffered.pop(next_index)
+                next_index += 1
+
+        for index, chunk in enumerate(_chunked(iterable, chunk_size)):
+            while pending >= limit:
+                yield from collect()
+            submit(index, chunk)
+            pending += 1
+        while pending:
+            yield from collect()
+
+def _grid_edges(diagonal: bool) -> List[Tuple[Tuple[slice, slice], Tuple[slice, slice]]]:
+    """Slice pairs selecting each cell and its forward neighbor per direction"""
+    full, head, tail = slice(None), slice(None, -1), slice(1, None)
+    pairs = [((head, full), (tail, full))]  # down
+    if diagonal:
+        pairs.append(((head, head), (tail, tail)))  # down-right
+        pairs.append(((head, tail), (tail, head)))  # down-left
+    return pairs
+
+def _label_components(mask: np.ndarray,
+                      diagonal: bool = False,
+                      classes: Optional[np.ndarray] = None) -> np.ndarray:
+    """Connected-component labelling of a boolean grid
+
+    With `classes`, neighbors are only connected when their class values
+    are equal, which labels every class of a multi-valued grid at once.
+
+    Horizontal runs are found with a raster scan, then runs touching
+    vertically (or diagonally) are merged with a vectorized union-find:
+    every round hooks each root onto the smallest adjacent root and
+    compresses paths by pointer jumping, so the number of components at
+    least halves per round. Labels are 1..n in raster order of each
+    component's first cell; background is 0.
+    """
+    height, width = mask.shape
+    left = np.zeros_like(mask)
+    left[:, 1:] = mask[:, 1:] & mask[:, :-1]
+    if classes is not None:
+        left[:, 1:] &= classes[:, 1:] == classes[:, :-1]
+    starts = mask & ~left
+    run_of_cell = np.cumsum(starts.ravel(), dtype=np.int64).reshape(mask.shape) - 1
+    run_count = int(run_of_cell[-1, -1] + 1) if mask.size else 0
+
+    a_parts, b_parts = [], []
+    for src, dst in _grid_edges(diagonal):
+        touching = mask[src] & mask[dst]
+        if classes is not None:
+            touching &= classes[src] == classes[dst]
+        a, b = run_of_cell[src][touching], run_of_cell[dst][touching]
+        if a.size:
+            # Overlapping runs produce long streaks of the same pair
+            keep = np.ones(a.size, dtype=bool)
+            keep[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+            a_parts.append(a[keep])
+            b_parts.append(b[keep])
+    a = np.concatenate(a_parts) if a_parts else np.zeros(0, dtype=np.int64)
+    b = np.concatenate(b_parts) if b_parts else np.zeros(0, dtype=np.int64)
+
+    parent = np.arange(run_count, dtype=np.int64)
+    while a.size:
+        ra, rb = parent[a], parent[b]
+        crossing = ra != rb
+        if not crossing.any():
+            break
+        a, b, ra, rb = a[crossing], b[crossing], ra[crossing], rb[crossing]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    is_root = parent == np.arange(run_count)
+    label_of_run = np.cumsum(is_root, dtype=np.int64)[parent]
+    labels = np.zeros(mask.shape, dtype=np.int32 if run_count < 2**31 - 1 else np.int64)
+    labels[mask] = label_of_run[run_of_cell[mask]]
+    return labels
+
+@dataclass
+class Regions:
+    """Labelled grid plus per-region statistics
+
+    `labels` is 0 for background and 1..count for regions. The per-region
+    arrays are indexed by `label - 1`; `bboxes` rows are
+    (min_y, min_x, max_y, max_x) inclusive.
+    """
+    labels: np.ndarray
+    areas: np.ndarray
+    bboxes: np.ndarray
+    cell_index: np.ndarray
+    cell_offsets: np.ndarray
+
+    @classmethod
+    def from_labels(cls, labels: np.ndarray, min_size: int = 1) -> 'Regions':
+        """Gather statistics for an array of consecutive labels in one pass"""
+        flat = labels.ravel()
+        areas = np.bincount(flat, minlength=1)[1:]
+        if min_size > 1 and (areas < min_size).any():
+            keep = areas >= min_size
+            remap = np.zeros(areas.size + 1, dtype=labels.dtype)
+            remap[1:][keep] = np.arange(1, keep.sum() + 1)
+            labels = remap[labels]
+            flat = labels.ravel()
+            areas = areas[keep]
+
+        cells = np.flatnonzero(flat)
+        cell_index = cells[np.argsort(flat[cells], kind='stable')]
+        cell_offsets = np.zeros(areas.size + 1, dtype=np.int64)
+        np.cumsum(areas, out=cell_offsets[1:])
+
+        width = labels.shape[1]
+        bboxes = np.zeros((areas.size, 4), dtype=np.int64)
+        if areas.size:
+            ys, xs = np.divmod(cell_index, width)
+            first, last = cell_offsets[:-1], cell_offsets[1:] - 1
+            bboxes[:, 0] = ys[first]
+            bboxes[:, 1] = np.minimum.reduceat(xs, first)
+            bboxes[:, 2] = ys[last]
+            bboxes[:, 3] = np.maximum.reduceat(xs, first)
+        return cls(labels, areas, bboxes, cell_index, cell_offsets)
+
+    @property
+    def count(self) -> int:
+        return int(self.areas.size)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def cells(self, label: int) -> np.ndarray:
+        """(n, 2) array of (y, x) coordinates of a region, in raster order"""
+        flat = self.cell_index[self.cell_offsets[label - 1]:self.cell_offsets[label]]
+        return np.column_stack(np.divmod(flat, self.labels.shape[1]))
+
+def _grid_codes(data: np.ndarray) -> np.ndarray:
+    """Integer view of a character grid: uint8 as is, 'S1' as bytes, 'U1' as code points"""
+    if data.dtype.kind == 'U' and data.dtype.itemsize == 4:
+        return data.view(np.uint32)
+    if data.dtype.kind == 'S' and data.dtype.itemsize == 1:
+        return data.view(np.uint8)
+    return data
+
+def _cell_code(value: Union[str, bytes, int]) -> int:
+    return ord(value) if isinstance(value, (str, bytes)) else int(value)
+
+def _packed_equal(codes: np.ndarray, value: int, row_block: int = 1024) -> np.ndarray:
+    """(H, ceil(W / 64)) uint64 bitmask of cells equal to value
+
+    Bit i of word j in a row is column 64 * j + i. Built in row blocks so
+    the full-size boolean temporary never exists.
+    """
+    height, width = codes.shape
+    words = -(-width // 64)
+    packed = np.zeros((height, words * 8), dtype=np.uint8)
+    for r0 in range(0, height, row_block):
+        bits = np.packbits(codes[r0:r0 + row_block] == value, axis=1, bitorder='little')
+        packed[r0:r0 + row_block, :bits.shape[1]] = bits
+    return packed.view('<u8')
+
+def _shift_columns(words: np.ndarray, shift: int) -> np.ndarray:
+    """Bitmask whose column c holds column c + shift of `words` (zero past the end)"""
+    whole, bits = divmod(shift, 64)
+    source = words[:, whole:]
+    out = np.zeros_like(words)
+    n = source.shape[1]
+    if bits == 0:
+        out[:, :n] = source
+    else:
+        out[:, :n] = source >> np.uint64(bits)
+        out[:, :n - 1] |= source[:, 1:] << np.uint64(64 - bits)
+    return out
+
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+def _popcount(words: np.ndarray) -> int:
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_POPCOUNT8[words.view(np.uint8)].sum())
+
+def _match_rule_sets(codes: np.ndarray,
+                     rule_sets: List[Iterable[Tuple[int, int, Any]]],
+                     coords: bool = False,
+                     row_limit: Optional[int] = None) -> List[Union[int, np.ndarray]]:
+    """Match several shapes given as (dy, dx, value) rules over one grid
+
+    Each distinct value is compared against the grid once and bit-packed;
+    every rule then costs one shifted AND of the packed masks, so many
+    shapes (directions, rotations) share the expensive pass. Returns per
+    shape the anchor count, or (n, 2) anchor coordinates in raster order.
+    Only placements whose top row is below `row_limit` are considered.
+    """
+    rule_sets = [np.array([(dy, dx, _cell_code(v)) for dy, dx, v in rules], dtype=np.int64).reshape(-1, 3)
+                 for rules in rule_sets]
+    if any(not len(rules) for rules in rule_sets):
+        raise ValueError("A pattern needs at least one cell to match")
+    masks = {}
+    height, width = codes.shape
+    results = []
+    for rules in rule_sets:
+        top, left = rules[:, 0].min(), rules[:, 1].min()
+        rows = height - (rules[:, 0].max() - top)
+        if row_limit is not None:
+            rows = min(rows, row_limit)
+        cols = width - (rules[:, 1].max() - left)
+        if rows <= 0 or cols <= 0:
+            results.append(np.zeros((0, 2), dtype=np.int64) if coords else 0)
+            continue
+        found = None
+        for dy, dx, value in rules.tolist():
+            if value not in masks:
+                masks[value] = _packed_equal(codes, value)
+            shifted = _shift_columns(masks[value][dy - top:dy - top + rows], dx - left)
+            found = shifted if found is None else np.bitwise_and(found, shifted, out=found)
+        # Drop anchors whose shape would run past the right edge
+        found[:, cols // 64 + 1:] = 0
+        if cols % 64:
+            found[:, cols // 64] &= np.uint64((1 << int(cols % 64)) - 1)
+        else:
+            found[:, cols // 64:] = 0
+        if coords:
+            bits = np.unpackbits(found.view(np.uint8), axis=1, bitorder='little')
+            results.append(np.column_stack(np.nonzero(bits)).astype(np.int64) - (top, left))
+        else:
+            results.append(_popcount(found))
+    return results
+
+def _pattern_rules(pattern: Union[List[str], np.ndarray], wildcard: Any) -> List[Tuple[int, int, Any]]:
+    """(dy, dx, value) rules of a 2D pattern, skipping wildcard cells"""
+    rows = [list(row) for row in pattern]
+    return [(y, x, value) for y, row in enumerate(rows) for x, value in enumerate(row)
+            if wildcard is None or value != wildcard]
+
+def _rule_rotations(rules: List[Tuple[int, int, Any]]) -> List[List[Tuple[int, int, Any]]]:
+    """Distinct quarter-turn rotations of a rule set (symmetric shapes appear once)"""
+    result, seen = [], set()
+    for _ in range(4):
+        top = min(dy for dy, _, _ in rules)
+        left = min(dx for _, dx, _ in rules)
+        key = frozenset((dy - top, dx - left, _cell_code(v)) for dy, dx, v in rules)
+        if key not in seen:
+            seen.add(key)
+            result.append(rules)
+        rules = [(dx, -dy, value) for dy, dx, value in rules]
+    return result
+
+def _match_tile(arrays: Dict[str, np.ndarray], task: Tuple[int, int, int, list, bool]) -> List[Union[int, np.ndarray]]:
+    """Worker-side: match shapes whose top row falls in rows [start, stop) of the grid
+
+    The tile is read with `halo` extra rows below it, so shapes crossing
+    the border are seen whole, and only placements starting inside the
+    tile are counted, so none is counted twice.
+    """
+    start, stop, halo, rule_sets, coords = task
+    results = _match_rule_sets(arrays['grid'][start:stop + halo], rule_sets, coords, stop - start)
+    return [found + (start, 0) for found in results] if coords else results
+
+_PARALLEL_MATCH_CELLS = 1 << 24
 
 class GridProcessor:
     """Enhanced grid processing with GPU support"""
     def __init__(self, data: np.ndarray):
         self.data = data
         self.height, self.width = data.shape
-        self._cuda_enabled = cuda.is_available()
+
+    @property
+    def _cuda_enabled(self) -> bool:
+        return _cuda_available()
 
     @staticmethod
     @jit(nopython=True)
-    def _neighbors_orthogonal(y: int, x: int, height: int, width: int) -> List[Tuple[int, int]]:
-        """Get orthogonal neighbors (up, down, left, right)"""
-        neighbors = []
-        for dy, dx in [(-1,0), (1,0), (0,-1), (0,1)]:
-            ny, nx = y + dy, x + dx
-            if 0 <= ny < height and 0 <= nx < width:
-                neighbors.append((ny, nx))
-        return neighbors
+    def _neighbors_orthogonal(y: int, x: int, height: int, width: int) -> np.ndarray:
+        """Get orthogonal neighbors (up, down, left, right) as a (k, 2) array"""
+        return _neighbors_in_bounds(y, x, height, width, _ORTHOGONAL_MOVES)
 
     @staticmethod
     @jit(nopython=True)
-    def _neighbors_diagonal(y: int, x: int, height: int, width: int) -> List[Tuple[int, int]]:
-        """Get diagonal neighbors"""
-        neighbors = []
-        for dy, dx in [(1,1), (1,-1), (-1,1), (-1,-1)]:
-            ny, nx = y + dy, x + dx
-            if 0 <= ny < height and 0 <= nx < width:
-                neighbors.append((ny, nx))
-        return neighbors
+    def _neighbors_diagonal(y: int, x: int, height: int, width: int) -> np.ndarray:
+        """Get diagonal neighbors as a (k, 2) array"""
+        return _neighbors_in_bounds(y, x, height, width, _DIAGONAL_MOVES)
 
     def get_neighbors(self, y: int, x: int, diagonal: bool = False) -> List[Tuple[int, int]]:
         """Get all valid neighboring coordinates"""
-        neighbors = self._neighbors_orthogonal(y, x, self.height, self.width)
+        neighbors = list(map(tuple, self._neighbors_orthogonal(y, x, self.height, self.width).tolist()))
         if diagonal:
-            neighbors.extend(self._neighbors_diagonal(y, x, self.height, self.width))
+            neighbors.extend(map(tuple, self._neighbors_diagonal(y, x, self.height, self.width).tolist()))
         return neighbors
 
+    def neighbor_table(self, diagonal: bool = False) -> np.ndarray:
+        """Flat ids of every cell's neighbors in one pass
+
+        Returns an (H*W, k) array where row `y * W + x` lists the neighbors
+        of (y, x) in `get_neighbors` order, padded with -1 where a move
+        leaves the grid.
+        """
+        moves = np.concatenate([_ORTHOGONAL_MOVES, _DIAGONAL_MOVES]) if diagonal else _ORTHOGONAL_MOVES
+        ys, xs = np.divmod(np.arange(self.height * self.width), self.width)
+        ny = ys[:, None] + moves[:, 0]
+        nx = xs[:, None] + moves[:, 1]
+        inside = (ny >= 0) & (ny < self.height) & (nx >= 0) & (nx < self.width)
+        return np.where(inside, ny * self.width + nx, -1)
+
+    def condition_mask(self, condition: Union[Callable[[Any], bool], np.ndarray]) -> np.ndarray:
+        """Evaluate a cell predicate over the whole grid as a boolean mask
+
+        Array-aware predicates (e.g. `lambda v: v == 'A'`) run vectorized;
+        anything else falls back to an element-wise call.
+        """
+        if isinstance(condition, np.ndarray):
+            return condition.astype(bool, copy=False)
+        try:
+            mask = condition(self.data)
+        except Exception:
+            mask = None
+        if not isinstance(mask, np.ndarray) or mask.shape != self.data.shape:
+            mask = np.vectorize(condition, otypes=[bool])(self.data)
+        return mask.astype(bool, copy=False)
+
+    def label_regions(self,
+                      condition: Union[Callable[[Any], bool], np.ndarray, None] = None,
+                      diagonal: bool = False,
+                      min_size: int = 1) -> 'Regions':
+        """Label connected regions of cells matching condition (all cells if None)"""
+        if condition is None:
+            mask = np.ones(self.data.shape, dtype=bool)
+        else:
+            mask = self.condition_mask(condition)
+        labels = _label_components(mask, diagonal=diagonal)
+        return Regions.from_labels(labels, min_size=min_size)
+
+    def label_classes(self,
+                      diagonal: bool = False,
+                      background: Any = None,
+                      min_size: int = 1) -> 'Regions':
+        """Label connected runs of equal values for every value in one pass
+
+        Cells equal to `background` are left unlabelled (0).
+        """
+        if background is None:
+            mask = np.ones(self.data.shape, dtype=bool)
+        else:
+            mask = self.data != background
+        labels = _label_components(mask, diagonal=diagonal, classes=self.data)
+        return Regions.from_labels(labels, min_size=min_size)
+
+    @staticmethod
+    def region_perimeters(labels: np.ndarray) -> np.ndarray:
+        """Count boundary edges of every label (indexed by label - 1)
+
+        An edge counts when the orthogonal neighbor has a different label
+        or lies outside the grid.
+        """
+        count = int(labels.max(initial=0))
+        padded = np.pad(labels, 1, constant_values=-1)
+        inner = padded[1:-1, 1:-1]
+        perimeters = np.zeros(count + 1, dtype=np.int64)
+        for neighbor in (padded[:-2, 1:-1], padded[2:, 1:-1],
+                         padded[1:-1, :-2], padded[1:-1, 2:]):
+            edge = (inner != neighbor) & (inner > 0)
+            perimeters += np.bincount(inner[edge], minlength=count + 1)
+        return perimeters[1:]
+
+    @staticmethod
+    def region_sides(labels: np.ndarray) -> np.ndarray:
+        """Count straight sides of every label (indexed by label - 1)
+
+        A polygon has as many sides as corners, so corners are counted on
+        every 2x2 window of the padded label array: a cell owns a convex
+        corner when both window neighbors differ from it, and a concave one
+        when both match but the diagonal cell differs. Holes and regions
+        touching only diagonally come out right, and the cost is a fixed
+        number of array passes regardless of how many regions exist.
+        """
+        count = int(labels.max(initial=0))
+        padded = np.pad(labels, 1, constant_values=-1)
+        tl, tr = padded[:-1, :-1], padded[:-1, 1:]
+        bl, br = padded[1:, :-1], padded[1:, 1:]
+        sides = np.zeros(count + 1, dtype=np.int64)
+        for cell, side_a, side_b, diagonal in ((tl, tr, bl, br), (tr, tl, br, bl),
+                                               (bl, tl, br, tr), (br, tr, bl, tl)):
+            convex = (side_a != cell) & (side_b != cell)
+            concave = (side_a == cell) & (side_b == cell) & (diagonal != cell)
+            corner = (convex | concave) & (cell > 0)
+            sides += np.bincount(cell[corner], minlength=count + 1)
+        return sides[1:]
+
+    def as_graph(self,
+                 passable: Union[Callable[[Any], bool], np.ndarray, None] = None,
+                 costs: Optional[np.ndarray] = None,
+                 diagonal: bool = False) -> 'GridGraph':
+        """Implicit graph view of this grid for PathFinder"""
+        return GridGraph(self, passable, costs, diagonal)
+
+    def match_cells(self,
+                    *rule_sets: Iterable[Tuple[int, int, Union[str, int]]],
+                    coords: bool = False) -> Union[int, np.ndarray]:
+        """Count or locate placements of shapes given as (dy, dx, value) rules
+
+        An anchor (y, x) matches a shape when grid[y + dy, x + dx] == value
+        for each of its rules; values are characters or integer codes.
+        Several shapes (e.g. rotations) share one pass over the grid.
+        Returns the total number of matches, or their (n, 2) anchor
+        coordinates, shape by shape in raster order.
+        """
+        results = _match_rule_sets(_grid_codes(self.data), list(rule_sets), coords)
+        return np.concatenate(results) if coords else sum(results)
+
+    def find_word(self,
+                  word: str,
+                  diagonal: bool = True,
+                  coords: bool = False) -> Union[int, np.ndarray]:
+        """Count or locate a word read in a straight line in every direction
+
+        Searches the 4 orthogonal and (with `diagonal`) 4 diagonal
+        directions in one pass. With `coords`, returns (n, 4) rows of
+        (y, x, dy, dx): the first letter and the direction of reading.
+        """
+        moves = (_ALL_MOVES if diagonal else _ORTHOGONAL_MOVES).tolist()
+        rule_sets = [[(i * dy, i * dx, ch) for i, ch in enumerate(word)] for dy, dx in moves]
+        results = _match_rule_sets(_grid_codes(self.data), rule_sets, coords)
+        if not coords:
+            return sum(results)
+        return np.concatenate([np.column_stack([found, np.tile(move, (len(found), 1))])
+                               for found, move in zip(results, moves)]).astype(np.int64)
+
+    def match_pattern(self,
+                      pattern: Union[List[str], np.ndarray],
+                      wildcard: Any = '.',
+                      rotations: bool = True,
+                      coords: bool = False,
+                      processor: Optional[ParallelProcessor] = None,
+                      tile_rows: Optional[int] = None) -> Union[int, np.ndarray]:
+        """Count or locate a 2D pattern, optionally in all four rotations
+
+        `pattern` is a list of strings or a 2D array; cells equal to
+        `wildcard` match anything. A rotation that equals an earlier one
+        is only searched once. Coordinates are the grid positions of the
+        pattern's top-left cell (of the unrotated pattern's cell (0, 0) for
+        rotations), rotation by rotation.
+
+        Grids of 16M+ cells (or any grid when `processor` is given) are
+        split into row tiles searched by ParallelProcessor workers against
+        one shared copy of the grid; each tile reads a halo of pattern
+        height - 1 rows below it and only owns placements starting inside it.
+        """
+        rules = _pattern_rules(pattern, wildcard)
+        rule_sets = _rule_rotations(rules) if rotations else [rules]
+        codes = _grid_codes(self.data)
+        if processor is None and (codes.size < _PARALLEL_MATCH_CELLS or (os.cpu_count() or 1) < 2):
+            results = _match_rule_sets(codes, rule_sets, coords)
+        else:
+            proc = processor or _default_processor()
+            halo = max(max(dy for dy, _, _ in rs) - min(dy for dy, _, _ in rs) for rs in rule_sets)
+            tile_rows = tile_rows or max(halo + 1, -(-self.height // (4 * proc.max_workers)))
+            tasks = [(start, min(start + tile_rows, self.height), halo, rule_sets, coords)
+                     for start in range(0, self.height, tile_rows)]
+            tiles = proc.map_shared(_match_tile, {'grid': np.ascontiguousarray(codes)}, tasks, chunk_size=1)
+            results = [np.concatenate(found) if coords else sum(found) for found in zip(*tiles)]
+        return np.concatenate(results) if coords else sum(results)
+
     def find_regions(self, 
                     condition: Callable[[Any], bool], 
                     diagonal: bool = False,
                     min_size: int = 1) -> List[Set[Tuple[int, int]]]:
-        """Find connected regions matching condition"""
-        visited = set()
-        regions = []
-        
-        def explore(start: Tuple[int, int]) -> Set[Tuple[int, int]]:
-            if start in visited:
-                return set()
-            
-            region = set()
-            queue = deque([start])
-            
-            while queue:
-                pos = queue.popleft()
-                if pos in visited:
+        """Find connected regions matching condition, in raster order of first cell"""
+        regions = self.label_regions(condition, diagonal, min_size)
+        return [set(map(tuple, regions.cells(label).tolist()))
+                for label in range(1, regions.count + 1)]
+
+class CSRGraph:
+    """Compact graph: nodes mapped to integer ids, edges in CSR arrays
+
+    The out-edges of node id `u` are `targets[offsets[u]:offsets[u + 1]]`
+    with matching `weights`, i.e. about 12 bytes per edge instead of a dict
+    entry per edge.
+    """
+    def __init__(self,
+                 nodes: List[Any],
+                 offsets: np.ndarray,
+                 targets: np.ndarray,
+                 weights: np.ndarray):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self._fingerprint = None
+        self._reversed = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the edge arrays and node labels (memoized)"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for array in (self.offsets, self.targets, self.weights):
+                digest.update(np.ascontiguousarray(array).data)
+            digest.update(repr(self.nodes).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def mark_changed(self):
+        """Call after editing the arrays in place so cached paths are not reused"""
+        self._fingerprint = None
+        self._reversed = None
+
+    @classmethod
+    def from_dict(cls, graph: Dict[T, Dict[T, float]]) -> 'CSRGraph':
+        """Convert an adjacency dict (e.g. from Parser.parse_graph)"""
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        for neighbors in graph.values():
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = len(nodes)
+                    nodes.append(neighbor)
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        offsets[1:len(graph) + 1] = np.cumsum([len(neighbors) for neighbors in graph.values()])
+        offsets[len(graph) + 1:] = offsets[len(graph)]
+        edge_count = int(offsets[-1])
+        targets = np.fromiter((index[v] for neighbors in graph.values() for v in neighbors),
+                              dtype=_id_dtype(len(nodes)), count=edge_count)
+        weights = np.fromiter((w for neighbors in graph.values() for w in neighbors.values()),
+                              dtype=np.float64, count=edge_count)
+        return cls(nodes, offsets, targets, weights)
+
+    @classmethod
+    def from_edges(cls,
+                   sources: np.ndarray,
+                   targets: np.ndarray,
+                   weights: Optional[np.ndarray] = None,
+                   num_nodes: Optional[int] = None,
+                   nodes: Optional[List[Any]] = None) -> 'CSRGraph':
+        """Build from parallel arrays of integer edge endpoints"""
+        sources = np.asarray(sources)
+        if num_nodes is None:
+            num_nodes = len(nodes) if nodes is not None else \
+                int(max(sources.max(initial=-1), np.max(targets, initial=-1)) + 1)
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+        weights = np.ones(sources.size) if weights is None else np.asarray(weights, dtype=np.float64)
+        return cls(nodes if nodes is not None else list(range(num_nodes)),
+                   offsets,
+                   np.asarray(targets)[order].astype(_id_dtype(num_nodes)),
+                   weights[order])
+
+    def reversed(self) -> 'CSRGraph':
+        """Graph with every edge flipped (memoized), for backward searches"""
+        if self._reversed is None:
+            sources = np.repeat(np.arange(self.num_nodes, dtype=self.targets.dtype),
+                                np.diff(self.offsets))
+            self._reversed = CSRGraph.from_edges(self.targets, sources, self.weights,
+                                                 self.num_nodes, self.nodes)
+        return self._reversed
+
+    @property
+    def num_nodes(self) -> int:
+        return self.offsets.size - 1
+
+    @property
+    def num_edges(self) -> int:
+        return self.targets.size
+
+    def id_of(self, node: Any) -> int:
+        """Node id of a node label, or -1 if it is not in the graph"""
+        return self.index.get(node, -1)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The CSR arrays, keyed for ParallelProcessor.map_shared"""
+        return {'offsets': self.offsets, 'targets': self.targets, 'weights': self.weights}
+
+    def neighbors(self, node_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(target ids, weights) of the out-edges of a node id"""
+        lo, hi = self.offsets[node_id], self.offsets[node_id + 1]
+        return self.targets[lo:hi], self.weights[lo:hi]
+
+    def to_dict(self, distances: np.ndarray) -> Dict[Any, float]:
+        """Map a per-id distance array back to {node: distance} for reached nodes"""
+        return {self.nodes[i]: float(distances[i]) for i in np.flatnonzero(np.isfinite(distances))}
+
+def _id_dtype(count: int) -> type:
+    return np.int32 if count < 2**31 else np.int64
+
+@jit(nopython=True)
+def _heap_sift_up(heap, pos, key, i):
+    """Move heap[i] up until its key is not smaller than its parent's"""
+    node = heap[i]
+    while i > 0:
+        parent = (i - 1) >> 1
+        if key[heap[parent]] <= key[node]:
+            break
+        heap[i] = heap[parent]
+        pos[heap[i]] = i
+        i = parent
+    heap[i] = node
+    pos[node] = i
+
+@jit(nopython=True)
+def _heap_sift_down(heap, pos, key, i, size):
+    """Move heap[i] down until neither child has a smaller key"""
+    node = heap[i]
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and key[heap[child + 1]] < key[heap[child]]:
+            child += 1
+        if key[heap[child]] >= key[node]:
+            break
+        heap[i] = heap[child]
+        pos[heap[i]] = i
+        i = child
+    heap[i] = node
+    pos[node] = i
+
+@jit(nopython=True)
+def _csr_dijkstra(offsets, targets, weights, source, goals):
+    """Dijkstra over CSR arrays with flat distances and an indexed binary heap
+
+    Each node sits in the heap at most once and improvements are applied
+    with decrease-key, so the heap never holds stale entries. Stops once
+    every node id in `goals` is settled (pass an empty array to settle
+    everything).
+    """
+    n = offsets.size - 1
+    dist = np.full(n, np.inf)
+    is_goal = np.zeros(n, dtype=np.bool_)
+    remaining = 0
+    for g in goals:
+        if not is_goal[g]:
+            is_goal[g] = True
+            remaining += 1
+    if remaining == 0:
+        remaining = -1
+    heap = np.empty(n, dtype=np.int64)
+    pos = np.full(n, -1, dtype=np.int64)
+    settled = np.zeros(n, dtype=np.bool_)
+    dist[source] = 0.0
+    heap[0] = source
+    pos[source] = 0
+    size = 1
+    while size > 0:
+        u = heap[0]
+        size -= 1
+        if size > 0:
+            heap[0] = heap[size]
+            pos[heap[0]] = 0
+            _heap_sift_down(heap, pos, dist, 0, size)
+        settled[u] = True
+        if is_goal[u]:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if settled[v]:
+                continue
+            candidate = dist[u] + weights[k]
+            if candidate < dist[v]:
+                dist[v] = candidate
+                if pos[v] < 0:
+                    heap[size] = v
+                    pos[v] = size
+                    size += 1
+                _heap_sift_up(heap, pos, dist, pos[v])
+    return dist
+
+_NO_GOALS = np.zeros(0, dtype=np.int64)
+
+def _csr_goal_distances(arrays: Dict[str, np.ndarray], root: int) -> np.ndarray:
+    """Worker-side search from one root of a shared CSR graph to all shared goals"""
+    goals = arrays['goals']
+    return _csr_dijkstra(arrays['offsets'], arrays['targets'], arrays['weights'],
+                         root, goals)[goals]
+
+_ORTHOGONAL_MOVES = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int64)
+_ALL_MOVES = np.array([(-1, 0), (1, 0), (0, -1), (0, 1),
+                       (-1, -1), (-1, 1), (1, -1), (1, 1)], dtype=np.int64)
+_DIAGONAL_MOVES = np.array([(1, 1), (1, -1), (-1, 1), (-1, -1)], dtype=np.int64)
+
+@jit(nopython=True)
+def _neighbors_in_bounds(y, x, height, width, moves):
+    """(k, 2) array of y, x + moves that stay inside a height x width grid"""
+    out = np.empty((moves.shape[0], 2), dtype=np.int64)
+    k = 0
+    for m in range(moves.shape[0]):
+        ny, nx = y + moves[m, 0], x + moves[m, 1]
+        if 0 <= ny < height and 0 <= nx < width:
+            out[k, 0] = ny
+            out[k, 1] = nx
+            k += 1
+    return out[:k]
+
+@jit(nopython=True)
+def _lazy_heap_push(keys, ties, values, size, key, tie, value):
+    """Push onto a growable (key, tie, value) min-heap; returns the possibly regrown arrays"""
+    if size == keys.size:
+        grown_keys = np.empty(2 * keys.size, dtype=keys.dtype)
+        grown_ties = np.empty(2 * ties.size, dtype=ties.dtype)
+        grown_values = np.empty(2 * values.size, dtype=values.dtype)
+        grown_keys[:size] = keys[:size]
+        grown_ties[:size] = ties[:size]
+        grown_values[:size] = values[:size]
+        keys, ties, values = grown_keys, grown_ties, grown_values
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 1
+        if not (keys[parent] > key or (keys[parent] == key and ties[parent] > tie)):
+            break
+        keys[i] = keys[parent]
+        ties[i] = ties[parent]
+        values[i] = values[parent]
+        i = parent
+    keys[i] = key
+    ties[i] = tie
+    values[i] = value
+    return keys, ties, values
+
+@jit(nopython=True)
+def _lazy_heap_pop(keys, ties, values, size):
+    """Pop the minimum of a heap holding `size` items; returns (key, value)"""
+    top_key, top_value = keys[0], values[0]
+    size -= 1
+    key, tie, value = keys[size], ties[size], values[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        right = child + 1
+        if right < size and (keys[right] < keys[child] or
+                             (keys[right] == keys[child] and ties[right] < ties[child])):
+            child = right
+        if not (keys[child] < key or (keys[child] == key and ties[child] < tie)):
+            break
+        keys[i] = keys[child]
+        ties[i] = ties[child]
+        values[i] = values[child]
+        i = child
+    keys[i] = key
+    ties[i] = tie
+    values[i] = value
+    return top_key, top_value
+
+@jit(nopython=True)
+def _grid_search(passable, costs, height, width, diagonal, flipped,
+                 source, goals, use_heuristic, heuristic_scale):
+    """Dijkstra / A* over an implicit grid given as flat arrays
+
+    Neighbors are computed from flat indices, so the only per-cell state is
+    the distance array (plus a goal mask when goals are given); the heap is
+    lazy and only as large as the frontier. A move needs a passable target
+    cell and costs 1 or that cell's `costs` entry; `flipped` runs the same
+    rules backwards (the left cell must be passable and is charged). With
+    `use_heuristic` and a single goal the search is A* on the Manhattan
+    (Chebyshev if diagonal) distance times `heuristic_scale`.
+    """
+    n = height * width
+    moves = _ALL_MOVES if diagonal else _ORTHOGONAL_MOVES
+    has_costs = costs.size > 0
+    dist = np.full(n, np.inf)
+    is_goal = np.zeros(n if goals.size > 0 else 0, dtype=np.bool_)
+    remaining = -1
+    if goals.size > 0:
+        remaining = 0
+        for g in goals:
+            if not is_goal[g]:
+                is_goal[g] = True
+                remaining += 1
+    use_heuristic = use_heuristic and goals.size == 1
+    goal_y, goal_x = (goals[0] // width, goals[0] % width) if goals.size > 0 else (0, 0)
+
+    keys = np.empty(1024, dtype=np.float64)
+    ties = np.empty(1024, dtype=np.float64)
+    values = np.empty(1024, dtype=np.int64)
+    dist[source] = 0.0
+    keys[0] = 0.0
+    ties[0] = 0.0
+    values[0] = source
+    size = 1
+    while size > 0:
+        key, u = _lazy_heap_pop(keys, ties, values, size)
+        size -= 1
+        y, x = u // width, u % width
+        h = 0.0
+        if use_heuristic:
+            dy, dx = abs(y - goal_y), abs(x - goal_x)
+            h = heuristic_scale * (max(dy, dx) if diagonal else dy + dx)
+        if key > dist[u] + h:
+            continue  # stale entry
+        if remaining > 0 and is_goal[u]:
+            remaining -= 1
+            if remaining == 0:
+                break
+        step = 1.0
+        if flipped:
+            if not passable[u]:
+                continue
+            if has_costs:
+                step = costs[u]
+        for k in range(moves.shape[0]):
+            ny, nx = y + moves[k, 0], x + moves[k, 1]
+            if ny < 0 or ny >= height or nx < 0 or nx >= width:
+                continue
+            v = ny * width + nx
+            if not flipped:
+                if not passable[v]:
                     continue
-                    
-                visited.add(pos)
-                if condition(self.data[pos]):
-                    region.add(pos)
-                    for n in self.get_neighbors(*pos, diagonal):
-                        if n not in visited:
-                            queue.append(n)
-            
-            return region if len(region) >= min_size else set()
-        
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for y in range(self.height):
-                for x in range(self.width):
-                    if (y, x) not in visited and condition(self.data[y, x]):
-                        futures.append(executor.submit(explore, (y, x)))
-            
-            regions = [f.result() for f in futures if f.result()]
-        
-        return regions
+                if has_costs:
+                    step = costs[v]
+            candidate = dist[u] + step
+            if candidate < dist[v]:
+                dist[v] = candidate
+                remaining_h = 0.0
+                if use_heuristic:
+                    dy, dx = abs(ny - goal_y), abs(nx - goal_x)
+                    remaining_h = heuristic_scale * (max(dy, dx) if diagonal else dy + dx)
+                # Ties on f are broken towards the goal, as in PathFinder.astar
+                keys, ties, values = _lazy_heap_push(keys, ties, values, size,
+                                                     candidate + remaining_h, remaining_h, v)
+                size += 1
+    return dist
+
+@jit(nopython=True)
+def _grid_relax(passable, costs, height, width, moves, flipped, u,
+                dist, keys, ties, values, size, other, best, meeting):
+    """Relax the moves out of flat cell `u` for one side of `_grid_bidirectional`
+
+    Returns the possibly regrown heap with its new size, and the best
+    meeting cost and cell after checking each improved neighbor against
+    the `other` side's distances.
+    """
+    y, x = u // width, u % width
+    step = 1.0
+    if flipped:
+        if not passable[u]:
+            return keys, ties, values, size, best, meeting
+        if costs.size > 0:
+            step = costs[u]
+    for k in range(moves.shape[0]):
+        ny, nx = y + moves[k, 0], x + moves[k, 1]
+        if ny < 0 or ny >= height or nx < 0 or nx >= width:
+            continue
+        v = ny * width + nx
+        if not flipped:
+            if not passable[v]:
+                continue
+            if costs.size > 0:
+                step = costs[v]
+        candidate = dist[u] + step
+        if candidate < dist[v]:
+            dist[v] = candidate
+            keys, ties, values = _lazy_heap_push(keys, ties, values, size, candidate, 0.0, v)
+            size += 1
+        if dist[v] + other[v] < best:
+            best, meeting = dist[v] + other[v], v
+    return keys, ties, values, size, best, meeting
+
+@jit(nopython=True)
+def _grid_bidirectional(passable, costs, height, width, diagonal, source, target):
+    """Bidirectional Dijkstra between two flat cells of an implicit grid
+
+    Grows a forward frontier from `source` and a flipped one from `target`
+    on lazy heaps, always expanding the side with the smaller key, and
+    stops once the two keys together reach the best meeting cost. Returns
+    (forward distances, backward distances, cost, meeting cell); the
+    meeting cell is -1 when target is unreachable.
+    """
+    n = height * width
+    moves = _ALL_MOVES if diagonal else _ORTHOGONAL_MOVES
+    forward = np.full(n, np.inf)
+    backward = np.full(n, np.inf)
+    forward[source] = 0.0
+    backward[target] = 0.0
+    f_keys = np.zeros(1024, dtype=np.float64)
+    f_ties = np.zeros(1024, dtype=np.float64)
+    f_values = np.empty(1024, dtype=np.int64)
+    b_keys = np.zeros(1024, dtype=np.float64)
+    b_ties = np.zeros(1024, dtype=np.float64)
+    b_values = np.empty(1024, dtype=np.int64)
+    f_values[0] = source
+    b_values[0] = target
+    f_size, b_size = 1, 1
+    best, meeting = np.inf, -1
+    while True:
+        # Drop stale entries so both heap tops are live frontier keys
+        while f_size > 0 and f_keys[0] > forward[f_values[0]]:
+            _lazy_heap_pop(f_keys, f_ties, f_values, f_size)
+            f_size -= 1
+        while b_size > 0 and b_keys[0] > backward[b_values[0]]:
+            _lazy_heap_pop(b_keys, b_ties, b_values, b_size)
+            b_size -= 1
+        if f_size == 0 or b_size == 0 or f_keys[0] + b_keys[0] >= best:
+            break
+        if f_keys[0] <= b_keys[0]:
+            _, u = _lazy_heap_pop(f_keys, f_ties, f_values, f_size)
+            f_size -= 1
+            f_keys, f_ties, f_values, f_size, best, meeting = _grid_relax(
+                passable, costs, height, width, moves, False, u,
+                forward, f_keys, f_ties, f_values, f_size, backward, best, meeting)
+        else:
+            _, u = _lazy_heap_pop(b_keys, b_ties, b_values, b_size)
+            b_size -= 1
+            b_keys, b_ties, b_values, b_size, best, meeting = _grid_relax(
+                passable, costs, height, width, moves, True, u,
+                backward, b_keys, b_ties, b_values, b_size, forward, best, meeting)
+    return forward, backward, best, meeting
+
+@jit(nopython=True)
+def _grid_trace(distances, passable, costs, height, width, diagonal, flipped, target):
+    """Flat cells of a shortest path ending at `target`, source first
+
+    Walks back from target to a zero-distance cell, each time taking the
+    first neighbor whose distance plus the move cost matches. Forwards any
+    reached cell qualifies, since the source may itself be impassable;
+    `flipped` walks the real moves forwards, so the next cell must be
+    passable (walls get finite distances there, having out-moves). Returns
+    an empty array if no neighbor matches.
+    """
+    moves = _ALL_MOVES if diagonal else _ORTHOGONAL_MOVES
+    path = np.empty(16, dtype=np.int64)
+    path[0] = target
+    length = 1
+    current = target
+    while distances[current] > 0:
+        y, x = current // width, current % width
+        previous = -1
+        for k in range(moves.shape[0]):
+            ny, nx = y - moves[k, 0], x - moves[k, 1]
+            if ny < 0 or ny >= height or nx < 0 or nx >= width:
+                continue
+            candidate = ny * width + nx
+            if flipped and not passable[candidate]:
+                continue
+            step = 1.0
+            if costs.size > 0:
+                step = costs[candidate] if flipped else costs[current]
+            # Tolerance relative to the distance itself but far below one
+            # move, so long paths cannot wander onto a sibling branch
+            expected = distances[candidate] + step
+            if (distances[candidate] < distances[current] and
+                    abs(expected - distances[current]) <= 1e-9 * distances[current]):
+                previous = candidate
+                break
+        if previous < 0:
+            return path[:0]
+        if length == path.size:
+            grown = np.empty(2 * path.size, dtype=np.int64)
+            grown[:length] = path
+            path = grown
+        path[length] = previous
+        length += 1
+        current = previous
+    return path[:length][::-1].copy()
+
+class GridGraph:
+    """Implicit graph view over a grid: cells are nodes, moves are edges
+
+    Nothing per edge is stored. Nodes are (y, x) tuples in the public API and
+    flat indices `y * width + x` internally; a move into a passable cell
+    costs 1 or that cell's entry of `costs` (which must be positive).
+    """
+    def __init__(self,
+                 grid: Union[np.ndarray, 'GridProcessor'],
+                 passable: Union[Callable[[Any], bool], np.ndarray, None] = None,
+                 costs: Optional[np.ndarray] = None,
+                 diagonal: bool = False):
+        processor = grid if isinstance(grid, GridProcessor) else GridProcessor(np.asarray(grid))
+        self.height, self.width = processor.height, processor.width
+        if passable is None:
+            mask = np.ones((self.height, self.width), dtype=bool)
+        else:
+            mask = processor.condition_mask(passable)
+        self.passable = np.ascontiguousarray(mask).ravel()
+        if costs is None:
+            self.costs = np.zeros(0)
+        else:
+            self.costs = np.ascontiguousarray(costs, dtype=np.float64).ravel()
+            if self.costs.size != self.passable.size or (self.costs[self.passable] <= 0).any():
+                raise ValueError("costs must match the grid shape and be positive on passable cells")
+        self.diagonal = diagonal
+        self.flipped = False
+        self.moves = [tuple(m) for m in (_ALL_MOVES if diagonal else _ORTHOGONAL_MOVES).tolist()]
+        self._fingerprint = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of passability, costs and move rules (memoized)"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.packbits(self.passable).data)
+            digest.update(self.costs.data)
+            digest.update(repr((self.shape, self.diagonal, self.flipped)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def mark_changed(self):
+        """Call after editing passability or costs in place"""
+        self._fingerprint = None
+
+    def reversed(self) -> 'GridGraph':
+        """View with every move flipped; shares the arrays with this one"""
+        view = copy.copy(self)
+        view.flipped = not self.flipped
+        view._fingerprint = None
+        return view
+
+    def id_of(self, node: Tuple[int, int]) -> int:
+        """Flat index of an in-bounds (y, x) cell, or -1"""
+        y, x = node
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return y * self.width + x
+        return -1
+
+    def node_id(self, node: Tuple[int, int]) -> int:
+        """Flat index of a (y, x) cell; raises KeyError if it is off the grid"""
+        index = self.id_of(node)
+        if index < 0:
+            raise KeyError(node)
+        return index
+
+    def step_cost(self, source: int, target: int) -> float:
+        """Cost of the move between two flat indices"""
+        if not self.costs.size:
+            return 1.0
+        return float(self.costs[source if self.flipped else target])
+
+    def neighbors(self, node: Tuple[int, int]) -> Iterator[Tuple[Tuple[int, int], float]]:
+        """(neighbor, cost) pairs of the cells reachable in one move"""
+        y, x = node
+        u = y * self.width + x
+        if self.flipped and not self.passable[u]:
+            return
+        for dy, dx in self.moves:
+            ny, nx = y + dy, x + dx
+            if 0 <= ny < self.height and 0 <= nx < self.width:
+                v = ny * self.width + nx
+                if self.flipped or self.passable[v]:
+                    yield (ny, nx), self.step_cost(u, v)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Flat arrays plus move rules, keyed for ParallelProcessor.map_shared"""
+        meta = np.array([self.height, self.width, self.diagonal, self.flipped], dtype=np.int64)
+        return {'passable': self.passable, 'costs': self.costs, 'meta': meta}
+
+    def search(self, source: int, goals: np.ndarray = _NO_GOALS, heuristic: bool = False) -> np.ndarray:
+        """Flat distance array from a flat source index (see `_grid_search`)"""
+        scale = float(self.costs[self.passable].min(initial=np.inf)) if self.costs.size else 1.0
+        return _grid_search(self.passable, self.costs, self.height, self.width,
+                            self.diagonal, self.flipped, source, goals,
+                            heuristic, scale if np.isfinite(scale) else 0.0)
+
+    def bidirectional(self, source: int, target: int) -> Tuple[float, List[Tuple[int, int]]]:
+        """(cost, path) between two flat indices via `_grid_bidirectional`, or (inf, [])"""
+        if self.flipped:
+            cost, path = self.reversed().bidirectional(target, source)
+            return cost, path[::-1]
+        forward, backward, cost, meeting = _grid_bidirectional(
+            self.passable, self.costs, self.height, self.width, self.diagonal, source, target)
+        if meeting < 0:
+            return float('inf'), []
+        # The backward half is a shortest-path tree of the reversed view
+        head = self.trace_path(forward, meeting)
+        tail = self.reversed().trace_path(backward, meeting)
+        return float(cost), head + tail[::-1][1:]
+
+    def trace_path(self, distances: np.ndarray, target: int) -> List[Tuple[int, int]]:
+        """Recover a shortest path from a distance array by walking back from target"""
+        if not np.isfinite(distances[target]):
+            return []
+        path = _grid_trace(distances, self.passable, self.costs, self.height, self.width,
+                           self.diagonal, self.flipped, target)
+        if path.size == 0:
+            raise RuntimeError("distances do not describe a shortest-path tree")
+        ys, xs = np.divmod(path, self.width)
+        return list(zip(ys.tolist(), xs.tolist()))
+
+def _grid_goal_distances(arrays: Dict[str, np.ndarray], root: int) -> np.ndarray:
+    """Worker-side search from one root of a shared grid to all shared goals"""
+    height, width, diagonal, flipped = arrays['meta'].tolist()
+    goals = arrays['goals']
+    return _grid_search(arrays['passable'], arrays['costs'], height, width,
+                        bool(diagonal), bool(flipped), root, goals, False, 1.0)[goals]
+
+def _adjacency(graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph, 'GridProcessor'],
+               reverse: bool = False,
+               passable: Union[Callable[[Any], bool], np.ndarray, None] = None
+               ) -> Callable[[T], Iterable[Tuple[T, float]]]:
+    """Neighbor function `node -> [(neighbor, weight), ...]` for any supported graph
+
+    GridProcessor grids are searched implicitly through a GridGraph over
+    their `passable` cells (all cells if None).
+    """
+    if isinstance(graph, GridProcessor):
+        graph = GridGraph(graph, passable)
+    if isinstance(graph, GridGraph):
+        return (graph.reversed() if reverse else graph).neighbors
+
+    if isinstance(graph, CSRGraph):
+        csr = graph.reversed() if reverse else graph
+        nodes = csr.nodes
+
+        def csr_neighbors(node):
+            ids, weights = csr.neighbors(csr.index[node])
+            return zip([nodes[i] for i in ids.tolist()], weights.tolist())
+        return csr_neighbors
+
+    if reverse:
+        flipped: Dict[T, Dict[T, float]] = defaultdict(dict)
+        for node, neighbors in graph.items():
+            for neighbor, weight in neighbors.items():
+                flipped[neighbor][node] = weight
+        graph = flipped
+    return lambda node: graph.get(node, {}).items()
+
+def _is_coordinate(node: Any) -> bool:
+    """Whether a node is a non-empty tuple of plain numbers"""
+    return (isinstance(node, tuple) and len(node) > 0 and
+            all(isinstance(c, (int, float, np.integer, np.floating)) for c in node))
+
+def _heuristic(heuristic: Union[str, Callable[[T, T], float], None], goal: T) -> Callable[[T], float]:
+    """Resolve a heuristic name or callable into `node -> estimate to goal`
+
+    The named heuristics only make sense for coordinate-tuple nodes; for
+    any other goal they fall back to a zero estimate (plain Dijkstra).
+    """
+    if heuristic is None or (heuristic in ('manhattan', 'euclidean') and not _is_coordinate(goal)):
+        return lambda node: 0
+    if heuristic == 'manhattan':
+        return lambda node: Geometry.manhattan_distance(node, goal)
+    if heuristic == 'euclidean':
+        return lambda node: Geometry.euclidean_distance_squared(node, goal) ** 0.5
+    if callable(heuristic):
+        return lambda node: heuristic(node, goal)
+    raise ValueError(f"Unknown heuristic: {heuristic!r}")
+
+def _trace_path(parents: Dict[T, Optional[T]], node: T) -> List[T]:
+    """Follow parent links back to the search root; returns root..node"""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    return path[::-1]
+
+class PathCache:
+    """Size-bounded LRU cache of single-source shortest-path results
+
+    Entries are keyed by (kind, graph fingerprint, source), plus a digest
+    of the goal set for early-exit searches, so a changed graph never
+    serves stale distances: its old entries just age out, or can be
+    dropped early with `invalidate`. Capacity is measured in
+    approximate bytes of the cached results rather than entry count.
+    """
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph]) -> Hashable:
+        """Content fingerprint of a graph (O(edges) for adjacency dicts)"""
+        if isinstance(graph, (CSRGraph, GridGraph)):
+            return graph.fingerprint
+        return hash(tuple((node, tuple(neighbors.items())) for node, neighbors in graph.items()))
+
+    @staticmethod
+    def _footprint(result: Any) -> int:
+        if isinstance(result, np.ndarray):
+            return result.nbytes
+        # Dict slots plus one boxed float per entry; keys are shared with the graph
+        return sys.getsizeof(dict(result)) + 24 * len(result)
+
+    def get(self, key: Hashable, count: bool = True) -> Any:
+        """Cached result for key, or None; `count=False` leaves the counters alone"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if count:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        return entry[0] if entry is not None else None
+
+    def get_any(self, keys: Iterable[Hashable]) -> Tuple[Optional[Hashable], Any]:
+        """(key, result) of the first cached key, counted as a single hit or
+        miss; (None, None) if none is cached"""
+        for key in keys:
+            result = self.get(key, count=False)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return key, result
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, key: Hashable, result: Any):
+        """Store a result, evicting least recently used entries over budget"""
+        size = self._footprint(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph, None] = None,
+                   fingerprint: Optional[Hashable] = None):
+        """Drop entries of one graph (by object or fingerprint), or all of them"""
+        if graph is not None:
+            fingerprint = self.fingerprint(graph)
+        with self._lock:
+            if graph is None and fingerprint is None:
+                self._entries.clear()
+                self.bytes = 0
+                return
+            for key in [k for k in self._entries if k[1] == fingerprint]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def info(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current usage"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'bytes': self.bytes}
 
 class PathFinder:
     """Advanced pathfinding with multiple algorithms"""
-    def __init__(self, parallel: bool = True):
+    def __init__(self, parallel: bool = True, processor: Optional[ParallelProcessor] = None):
         self.parallel = parallel
-        self._processor = ParallelProcessor() if parallel else None
+        # Instances share the module's warm pool unless given their own
+        self._processor = (processor or _default_processor()) if parallel else None
+
+    def close(self):
+        """Shut down the worker pool used by parallel queries (restarted on next use)"""
+        if self._processor:
+            self._processor.shutdown()
     
+    cache: 'PathCache' = None  # shared by all instances, set below
+
     @staticmethod
-    @lru_cache(maxsize=1024)
-    def dijkstra(graph: Dict[T, Dict[T, float]], 
-                start: T, 
-                end: Optional[T] = None) -> Dict[T, float]:
-        """Cached Dijkstra's algorithm implementation"""
+    def _dijkstra_search(graph: Dict[T, Dict[T, float]], start: T) -> Dict[T, float]:
+        """Plain single-source Dijkstra over an adjacency dict"""
         distances = {start: 0}
         pq = [(0, start)]
         visited = set()
@@ -141,10 +1612,8 @@ class PathFinder:
                 continue
                 
             visited.add(current)
-            if end and current == end:
-                break
                 
-            for neighbor, weight in graph[current].items():
+            for neighbor, weight in graph.get(current, {}).items():
                 distance = current_distance + weight
                 if neighbor not in distances or distance < distances[neighbor]:
                     distances[neighbor] = distance
@@ -152,59 +1621,1489 @@ class PathFinder:
         
         return distances
 
+    @staticmethod
+    def dijkstra(graph: Dict[T, Dict[T, float]], 
+                start: T, 
+                end: Optional[T] = None,
+                fingerprint: Optional[Hashable] = None) -> Mapping[T, float]:
+        """Cached Dijkstra's algorithm implementation
+
+        On a GridGraph the result is a (height, width) distance array.
+        Results are complete single-source distance maps cached in
+        `PathFinder.cache` under the graph's content fingerprint, so any
+        later query from `start` on an unchanged graph is a lookup; `end`
+        is accepted for compatibility. Pass a precomputed `fingerprint` to
+        skip rehashing the graph in tight loops. The returned mapping is
+        read-only.
+        """
+        if isinstance(graph, GridGraph):
+            return PathFinder._grid_distances(graph, start)
+        key = ('dict', fingerprint if fingerprint is not None else PathCache.fingerprint(graph), start)
+        distances = PathFinder.cache.get(key)
+        if distances is None:
+            distances = MappingProxyType(PathFinder._dijkstra_search(graph, start))
+            PathFinder.cache.put(key, distances)
+        return distances
+
+    @staticmethod
+    def _grid_distances(graph: GridGraph, start: Tuple[int, int]) -> np.ndarray:
+        """Cached full search over a GridGraph as a read-only (height, width) array"""
+        key = ('grid', graph.fingerprint, start)
+        distances = PathFinder.cache.get(key)
+        if distances is None:
+            distances = graph.search(graph.node_id(start)).reshape(graph.shape)
+            distances.flags.writeable = False
+            PathFinder.cache.put(key, distances)
+        return distances
+
+    @staticmethod
+    def dijkstra_csr(graph: CSRGraph, start: T, end: Optional[T] = None) -> np.ndarray:
+        """Array-backed Dijkstra on a CSRGraph
+
+        Returns distances indexed by node id (inf where unreached); use
+        `graph.to_dict` to get the dict form of `dijkstra`. Full searches
+        (no `end`) are cached in `PathFinder.cache` and returned read-only.
+        """
+        if end is not None:
+            return _csr_dijkstra(graph.offsets, graph.targets, graph.weights,
+                                 graph.index[start], np.array([graph.index[end]]))
+        key = ('csr', graph.fingerprint, start)
+        distances = PathFinder.cache.get(key)
+        if distances is None:
+            distances = _csr_dijkstra(graph.offsets, graph.targets, graph.weights,
+                                      graph.index[start], _NO_GOALS)
+            distances.flags.writeable = False
+            PathFinder.cache.put(key, distances)
+        return distances
+
+    @staticmethod
+    def astar(graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph, GridProcessor],
+              start: T,
+              end: T,
+              heuristic: Union[str, Callable[[T, T], float], None] = 'manhattan',
+              passable: Union[Callable[[Any], bool], np.ndarray, None] = None) -> Tuple[float, List[T]]:
+        """Point-to-point A* search; returns (cost, path) or (inf, [])
+
+        `heuristic` is 'manhattan', 'euclidean' (both over coordinate-tuple
+        nodes, via Geometry; other nodes get plain Dijkstra), a callable
+        `(node, goal) -> estimate`, or None for plain Dijkstra. It must not
+        overestimate for the cost to be optimal. `passable` only applies to
+        GridProcessor grids; grids with the 'manhattan' or no heuristic run
+        on the GridGraph kernel.
+        """
+        if isinstance(graph, GridProcessor):
+            graph = GridGraph(graph, passable)
+        if isinstance(graph, GridGraph) and heuristic in ('manhattan', None):
+            # Array kernel; on diagonal grids 'manhattan' becomes Chebyshev
+            source, target = graph.node_id(start), graph.node_id(end)
+            distances = graph.search(source, np.array([target]), heuristic == 'manhattan')
+            return float(distances[target]), graph.trace_path(distances, target)
+
+        neighbors = _adjacency(graph, passable=passable)
+        estimate = _heuristic(heuristic, end)
+        counter = itertools.count()
+        costs = {start: 0}
+        parents = {start: None}
+        # Ties on f are broken towards the goal (smaller h), which keeps A*
+        # from flooding plateaus of equal-cost cells on open grids
+        pq = [(estimate(start), 0, next(counter), start)]
+        closed = set()
+
+        while pq:
+            _, _, _, current = heapq.heappop(pq)
+            if current in closed:
+                continue
+            if current == end:
+                return costs[current], _trace_path(parents, current)
+            closed.add(current)
+
+            current_cost = costs[current]
+            for neighbor, weight in neighbors(current):
+                cost = current_cost + weight
+                if cost < costs.get(neighbor, float('inf')):
+                    costs[neighbor] = cost
+                    parents[neighbor] = current
+                    remaining = estimate(neighbor)
+                    heapq.heappush(pq, (cost + remaining, remaining, next(counter), neighbor))
+
+        return float('inf'), []
+
+    @staticmethod
+    def bidirectional_dijkstra(graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph, GridProcessor],
+                               start: T,
+                               end: T,
+                               passable: Union[Callable[[Any], bool], np.ndarray, None] = None
+                               ) -> Tuple[float, List[T]]:
+        """Point-to-point Dijkstra grown from both ends; returns (cost, path) or (inf, [])
+
+        The side with the smaller frontier key expands next, and the search
+        stops once the two frontier keys together reach the best meeting
+        cost, which roughly halves the explored radius. Grids run on the
+        `_grid_bidirectional` array kernel; `passable` only applies to
+        GridProcessor grids.
+        """
+        if start == end:
+            return 0, [start]
+        if isinstance(graph, GridProcessor):
+            graph = GridGraph(graph, passable)
+        if isinstance(graph, GridGraph):
+            return graph.bidirectional(graph.node_id(start), graph.node_id(end))
+
+        neighbors = (_adjacency(graph, passable=passable),
+                     _adjacency(graph, reverse=True, passable=passable))
+        counter = itertools.count()
+        distances = ({start: 0}, {end: 0})
+        parents = ({start: None}, {end: None})
+        queues = ([(0, next(counter), start)], [(0, next(counter), end)])
+        settled = (set(), set())
+        best, meeting = float('inf'), None
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            other = 1 - side
+            distance, _, current = heapq.heappop(queues[side])
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+
+            for neighbor, weight in neighbors[side](current):
+                candidate = distance + weight
+                if candidate < distances[side].get(neighbor, float('inf')):
+                    distances[side][neighbor] = candidate
+                    parents[side][neighbor] = current
+                    heapq.heappush(queues[side], (candidate, next(counter), neighbor))
+                if neighbor in distances[other]:
+                    total = distances[side][neighbor] + distances[other][neighbor]
+                    if total < best:
+                        best, meeting = total, neighbor
+
+        if meeting is None:
+            return float('inf'), []
+        forward = _trace_path(parents[0], meeting)
+        backward = _trace_path(parents[1], meeting)
+        return best, forward + backward[::-1][1:]
+
     def parallel_paths(self, 
-                      graph: Dict[T, Dict[T, float]], 
+                      graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph],
                       sources: List[T], 
                       targets: List[T]) -> Dict[Tuple[T, T], float]:
         """Compute multiple paths in parallel"""
-        if not self.parallel:
-            return {(s, t): self.dijkstra(graph, s, t).get(t, float('inf'))
+        if not self.parallel and not isinstance(graph, (CSRGraph, GridGraph)):
+            fingerprint = PathCache.fingerprint(graph)
+            return {(s, t): self.dijkstra(graph, s, t, fingerprint).get(t, float('inf'))
                     for s in sources for t in targets}
-        
-        with self._processor as proc:
-            pairs = list(itertools.product(sources, targets))
-            results = proc.map(
-                partial(lambda p: (p, self.dijkstra(graph, p[0], p[1]).get(p[1], float('inf'))), 
-                pairs)
-            )
-        return dict(results)
+
+        table = self.distance_table(graph, sources, targets)
+        return {(s, t): float(table[i, j])
+                for i, s in enumerate(sources) for j, t in enumerate(targets)}
+
+    def distance_table(self,
+                       graph: Union[Dict[T, Dict[T, float]], CSRGraph, GridGraph],
+                       sources: List[T],
+                       targets: List[T]) -> np.ndarray:
+        """Many-to-many shortest distances as a |sources| x |targets| array
+
+        Runs one search per distinct source that stops as soon as every
+        requested target is settled. With fewer targets than sources it
+        searches backwards from each target over the reversed graph
+        instead, so the number of searches is min(|S|, |T|).
+        """
+        view = graph if isinstance(graph, (CSRGraph, GridGraph)) else CSRGraph.from_dict(graph)
+        table = np.full((len(sources), len(targets)), np.inf)
+        source_ids = np.array([view.id_of(s) for s in sources], dtype=np.int64)
+        target_ids = np.array([view.id_of(t) for t in targets], dtype=np.int64)
+
+        # Nodes absent from the graph are only at distance 0 from themselves
+        for i in np.flatnonzero(source_ids < 0):
+            for j in np.flatnonzero(target_ids < 0):
+                if sources[i] == targets[j]:
+                    table[i, j] = 0.0
+
+        known_s = np.flatnonzero(source_ids >= 0)
+        known_t = np.flatnonzero(target_ids >= 0)
+        if not known_s.size or not known_t.size:
+            return table
+        unique_s, s_inverse = np.unique(source_ids[known_s], return_inverse=True)
+        unique_t, t_inverse = np.unique(target_ids[known_t], return_inverse=True)
+        if unique_t.size < unique_s.size:
+            block = self._search_rows(view.reversed(), unique_t, unique_s).T
+        else:
+            block = self._search_rows(view, unique_s, unique_t)
+        table[np.ix_(known_s, known_t)] = block[np.ix_(s_inverse, t_inverse)]
+        return table
+
+    def _search_rows(self, view: Union[CSRGraph, GridGraph], roots: np.ndarray, goals: np.ndarray) -> np.ndarray:
+        """Distances from each root id to each goal id, one early-exit search per root
+
+        Rows are served from full searches already in `PathFinder.cache` or
+        from earlier calls with the same goal set, and new rows are stored
+        under (kind, fingerprint, root, goal-set digest).
+        """
+        is_grid = isinstance(view, GridGraph)
+        kind = 'grid' if is_grid else 'csr'
+        goal_set = hashlib.blake2b(goals.tobytes(), digest_size=16).hexdigest()
+        rows = np.empty((roots.size, goals.size))
+        pending, keys = [], []
+        for i, root in enumerate(roots.tolist()):
+            node = divmod(root, view.width) if is_grid else view.nodes[root]
+            key = (kind, view.fingerprint, node, goal_set)
+            found, cached = PathFinder.cache.get_any([key, (kind, view.fingerprint, node)])
+            if found is None:
+                pending.append(i)
+                keys.append(key)
+            elif found == key:
+                rows[i] = cached
+            else:
+                rows[i] = cached.ravel()[goals]
+        if not pending:
+            return rows
+        pending_roots = roots[pending].tolist()
+        if self.parallel and len(pending) > 1:
+            worker = _grid_goal_distances if is_grid else _csr_goal_distances
+            with self._processor as proc:
+                rows[pending] = proc.map_shared(worker, {**view.arrays(), 'goals': goals},
+                                                pending_roots)
+        else:
+            for i, root in zip(pending, pending_roots):
+                if is_grid:
+                    rows[i] = view.search(root, goals)[goals]
+                else:
+                    rows[i] = _csr_dijkstra(view.offsets, view.targets, view.weights,
+                                            root, goals)[goals]
+        for i, key in zip(pending, keys):
+            row = rows[i].copy()
+            row.flags.writeable = False
+            PathFinder.cache.put(key, row)
+        return rows
+
+PathFinder.cache = PathCache()
+
+_DISTANCE_METRICS = {'manhattan': 0, 'chebyshev': 1, 'sqeuclidean': 2, 'euclidean': 3}
+
+@jit(nopython=True, inline='always')
+def _point_distance(a, i, b, j, metric):
+    """Distance between a[i] and b[j]; squared for both Euclidean metrics"""
+    total = a[i, 0] - a[i, 0]
+    for k in range(a.shape[1]):
+        diff = a[i, k] - b[j, k]
+        if metric == 0:
+            total += abs(diff)
+        elif metric == 1:
+            total = max(total, abs(diff))
+        else:
+            total += diff * diff
+    return total
+
+@jit(nopython=True, parallel=True)
+def _pairwise_kernel(a, b, metric, out):
+    for i in prange(a.shape[0]):
+        for j in range(b.shape[0]):
+            out[i, j] = _point_distance(a, i, b, j, metric)
+    return out
+
+@jit(nopython=True, parallel=True)
+def _nearest_kernel(a, b, metric, exclude_self, indices, distances):
+    for i in prange(a.shape[0]):
+        best = -1
+        best_distance = 0
+        for j in range(b.shape[0]):
+            if exclude_self and i == j:
+                continue
+            d = _point_distance(a, i, b, j, metric)
+            if best < 0 or d < best_distance:
+                best, best_distance = j, d
+        indices[i] = best
+        distances[i] = best_distance
+
+def _point_array(points: Union[np.ndarray, List[Tuple[float, ...]]]) -> np.ndarray:
+    """(n, d) int64 or float64 array from points (a single point becomes (1, d))"""
+    array = np.asarray(points)
+    array = array.reshape(1, -1) if array.ndim == 1 else array
+    if array.ndim != 2:
+        raise ValueError("Points must be an (n, d) array")
+    dtype = np.int64 if array.dtype.kind in 'biu' else np.float64
+    return np.ascontiguousarray(array, dtype=dtype)
+
+def _metric_code(metric: str) -> int:
+    if metric not in _DISTANCE_METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {list(_DISTANCE_METRICS)}")
+    return _DISTANCE_METRICS[metric]
+
+def _distance_dtype(points: np.ndarray, metric: str) -> type:
+    return np.float64 if metric == 'euclidean' else points.dtype
 
 class Geometry:
-    """Enhanced geometry utilities"""
+    """Enhanced geometry utilities
+
+    The batched helpers take (n, d) point arrays and a metric out of
+    'manhattan', 'chebyshev', 'sqeuclidean' or 'euclidean'. Integer points
+    give exact integer distances for every metric but 'euclidean'.
+    """
     @staticmethod
     @jit(nopython=True)
     def manhattan_distance(p1: Tuple[int, ...], p2: Tuple[int, ...]) -> int:
         """N-dimensional Manhattan distance"""
-        return sum(abs(a - b) for a, b in zip(p1, p2))
+        total = 0
+        for i in range(len(p1)):
+            total += abs(p1[i] - p2[i])
+        return total
     
     @staticmethod
     @jit(nopython=True)
     def euclidean_distance_squared(p1: Tuple[float, ...], p2: Tuple[float, ...]) -> float:
         """N-dimensional Euclidean distance squared"""
-        return sum((a - b) ** 2 for a, b in zip(p1, p2))
+        total = 0.0
+        for i in range(len(p1)):
+            total += (p1[i] - p2[i]) ** 2
+        return total
 
     @staticmethod
-    def convex_hull(points: List[Tuple[float, ...]]) -> List[Tuple[float, ...]]:
-        """Compute convex hull of N-dimensional points"""
+    def distances_to(points: np.ndarray, target: Tuple[float, ...], metric: str = 'manhattan') -> np.ndarray:
+        """(n,) distances from every point to one target"""
+        diff = _point_array(points) - _point_array(target)
+        if metric == 'manhattan':
+            return np.abs(diff).sum(axis=1)
+        if metric == 'chebyshev':
+            return np.abs(diff).max(axis=1)
+        squared = np.einsum('ij,ij->i', diff, diff)
+        return np.sqrt(squared) if _metric_code(metric) == 3 else squared
+
+    @staticmethod
+    def pairwise_distances(points: np.ndarray,
+                           other: Optional[np.ndarray] = None,
+                           metric: str = 'manhattan') -> np.ndarray:
+        """(n, m) matrix of distances between points and other (or points itself)
+
+        The full matrix is n * m values; for very large sets stream it with
+        `iter_pairwise_blocks` or reduce it with `pairwise_distance_sum`.
+        """
+        a = _point_array(points)
+        b = a if other is None else _point_array(other)
+        dtype = np.promote_types(a.dtype, b.dtype)
+        a, b = a.astype(dtype, copy=False), b.astype(dtype, copy=False)
+        out = np.empty((len(a), len(b)), dtype=_distance_dtype(a, metric))
+        _pairwise_kernel(a, b, _metric_code(metric), out)
+        return np.sqrt(out, out=out) if metric == 'euclidean' else out
+
+    @staticmethod
+    def iter_pairwise_blocks(points: np.ndarray,
+                             other: Optional[np.ndarray] = None,
+                             metric: str = 'manhattan',
+                             block_rows: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (row_start, block) slices of the pairwise matrix in bounded memory"""
+        a = _point_array(points)
+        b = a if other is None else _point_array(other)
+        for start in range(0, len(a), block_rows):
+            yield start, Geometry.pairwise_distances(a[start:start + block_rows], b, metric)
+
+    @staticmethod
+    def pairwise_distance_sum(points: np.ndarray, metric: str = 'manhattan') -> Union[int, float]:
+        """Sum of distances over all unordered pairs of points
+
+        Manhattan sums are exact and O(n log n): after sorting each axis,
+        the k-th smallest coordinate is added k times and subtracted
+        n - 1 - k times. Other metrics are summed block by block.
+        """
+        a = _point_array(points)
+        if metric == 'manhattan':
+            ordered = np.sort(a, axis=0)
+            weights = 2 * np.arange(len(a)) - (len(a) - 1)
+            total = (weights @ ordered).sum()
+        else:
+            total = sum(block.sum() for _, block in Geometry.iter_pairwise_blocks(a, metric=metric)) / 2
+        return total.item() if isinstance(total, np.generic) else total
+
+    @staticmethod
+    def nearest_neighbors(points: np.ndarray,
+                          other: Optional[np.ndarray] = None,
+                          metric: str = 'manhattan') -> Tuple[np.ndarray, np.ndarray]:
+        """Index into other (or points, excluding each point itself) and
+        distance of every point's nearest neighbor
+
+        Ties go to the lowest index; points with no candidate get index -1.
+        Runs in O(n * m) without materializing the distance matrix.
+        """
+        a = _point_array(points)
+        b = a if other is None else _point_array(other)
+        dtype = np.promote_types(a.dtype, b.dtype)
+        a, b = a.astype(dtype, copy=False), b.astype(dtype, copy=False)
+        indices = np.empty(len(a), dtype=np.int64)
+        distances = np.empty(len(a), dtype=_distance_dtype(a, metric))
+        _nearest_kernel(a, b, _metric_code(metric), other is None, indices, distances)
+        if metric == 'euclidean':
+            np.sqrt(distances, out=distances)
+        return indices, distances
+
+    @staticmethod
+    def convex_hull(points: Union[List[Tuple[float, ...]], np.ndarray]) -> Union[List[Tuple[float, ...]], np.ndarray]:
+        """Compute convex hull of N-dimensional points
+
+        An (n, d) array gives an array of hull vertices; a list gives the
+        original tuples. For 2D hulls that grow over time use IncrementalHull.
+        """
         if len(points) < 3:
             return points
-        hull = ConvexHull(np.array(points))
+        from scipy.spatial import ConvexHull
+        hull = ConvexHull(np.asarray(points))
+        if isinstance(points, np.ndarray):
+            return points[hull.vertices]
         return [points[i] for i in hull.vertices]
 
+    @staticmethod
+    def spatial_index(points: np.ndarray, **options) -> Union['GridIndex', 'KDTree']:
+        """Spatial index suited to the points: a GridIndex for integer lattice
+        points, a KDTree otherwise (options are passed to the index)"""
+        points = _point_array(points)
+        return GridIndex(points, **options) if points.dtype.kind == 'i' else KDTree(points, **options)
+
+@jit(nopython=True, inline='always')
+def _box_gap(q, i, lo, hi, node, metric):
+    """Lower bound on the distance from q[i] to any point in a node's box"""
+    total = 0.0
+    for k in range(q.shape[1]):
+        v = q[i, k]
+        if v < lo[node, k]:
+            gap = lo[node, k] - v
+        elif v > hi[node, k]:
+            gap = v - hi[node, k]
+        else:
+            continue
+        if metric == 0:
+            total += gap
+        elif metric == 1:
+            total = max(total, gap)
+        else:
+            total += gap * gap
+    return total
+
+@jit(nopython=True)
+def _select_nth(order, values, start, end, nth):
+    """Reorder order[start:end] so values[order[nth]] is in sorted position"""
+    lo, hi = start, end - 1
+    while lo < hi:
+        pivot = values[order[(lo + hi) // 2]]
+        i, j = lo, hi
+        while i <= j:
+            while values[order[i]] < pivot:
+                i += 1
+            while values[order[j]] > pivot:
+                j -= 1
+            if i <= j:
+                order[i], order[j] = order[j], order[i]
+                i += 1
+                j -= 1
+        if nth <= j:
+            hi = j
+        elif nth >= i:
+            lo = i
+        else:
+            break
+
+@jit(nopython=True)
+def _kdtree_build(points, leaf_size, max_nodes):
+    n, d = points.shape
+    order = np.arange(n)
+    start = np.zeros(max_nodes, dtype=np.int64)
+    end = np.zeros(max_nodes, dtype=np.int64)
+    left = np.full(max_nodes, -1, dtype=np.int64)
+    right = np.full(max_nodes, -1, dtype=np.int64)
+    lo = np.zeros((max_nodes, d), dtype=points.dtype)
+    hi = np.zeros((max_nodes, d), dtype=points.dtype)
+    stack = np.empty(max_nodes, dtype=np.int64)
+    end[0] = n
+    stack[0] = 0
+    top, count = 1, 1
+    while top:
+        top -= 1
+        node = stack[top]
+        s, e = start[node], end[node]
+        if s == e:
+            continue
+        lo[node] = points[order[s]]
+        hi[node] = points[order[s]]
+        for p in range(s + 1, e):
+            for k in range(d):
+                lo[node, k] = min(lo[node, k], points[order[p], k])
+                hi[node, k] = max(hi[node, k], points[order[p], k])
+        if e - s <= leaf_size:
+            continue
+        dim = np.argmax(hi[node] - lo[node])
+        if hi[node, dim] == lo[node, dim]:
+            continue  # all points coincide
+        mid = (s + e) // 2
+        _select_nth(order, points[:, dim], s, e, mid)
+        left[node], right[node] = count, count + 1
+        start[count], end[count] = s, mid
+        start[count + 1], end[count + 1] = mid, e
+        stack[top], stack[top + 1] = count, count + 1
+        top += 2
+        count += 2
+    return order, start[:count], end[:count], left[:count], right[:count], lo[:count], hi[:count]
+
+@jit(nopython=True)
+def _append(out, size, value):
+    """Store value at out[size], doubling the buffer when it is full"""
+    if size == len(out):
+        grown = np.empty(2 * len(out), dtype=out.dtype)
+        grown[:size] = out
+        out = grown
+    out[size] = value
+    return out
+
+@jit(nopython=True, inline='always')
+def _keep_nearest(best_idx, best_d, i, count, k, j, dist):
+    """Insert candidate j into query i's sorted k-best list; returns the new count"""
+    if count == k and (dist > best_d[i, k - 1] or (dist == best_d[i, k - 1] and j > best_idx[i, k - 1])):
+        return count
+    pos = min(count, k - 1)
+    while pos > 0 and (best_d[i, pos - 1] > dist or (best_d[i, pos - 1] == dist and best_idx[i, pos - 1] > j)):
+        best_d[i, pos] = best_d[i, pos - 1]
+        best_idx[i, pos] = best_idx[i, pos - 1]
+        pos -= 1
+    best_d[i, pos] = dist
+    best_idx[i, pos] = j
+    return min(count + 1, k)
+
+@jit(nopython=True)
+def _kdtree_radius(points, order, start, end, left, right, lo, hi, queries, limit, metric):
+    offsets = np.zeros(len(queries) + 1, dtype=np.int64)
+    out = np.empty(max(16, len(queries)), dtype=np.int64)
+    stack = np.empty(len(start) + 1, dtype=np.int64)
+    size = 0
+    for i in range(len(queries)):
+        first = size
+        top = 0
+        if len(start) and end[0] > start[0]:
+            stack[0] = 0
+            top = 1
+        while top:
+            top -= 1
+            node = stack[top]
+            if _box_gap(queries, i, lo, hi, node, metric) > limit:
+                continue
+            if left[node] >= 0:
+                stack[top], stack[top + 1] = left[node], right[node]
+                top += 2
+                continue
+            for p in range(start[node], end[node]):
+                j = order[p]
+                if _point_distance(queries, i, points, j, metric) <= limit:
+                    out = _append(out, size, j)
+                    size += 1
+        out[first:size] = np.sort(out[first:size])
+        offsets[i + 1] = size
+    return offsets, out[:size]
+
+@jit(nopython=True)
+def _kdtree_knn(points, order, start, end, left, right, lo, hi, queries, k, metric):
+    best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+    best_d = np.full((len(queries), k), np.inf)
+    stack = np.empty(len(start) + 1, dtype=np.int64)
+    for i in range(len(queries)):
+        count = 0
+        top = 0
+        if len(start) and end[0] > start[0]:
+            stack[0] = 0
+            top = 1
+        while top:
+            top -= 1
+            node = stack[top]
+            if count == k and _box_gap(queries, i, lo, hi, node, metric) > best_d[i, k - 1]:
+                continue
+            if left[node] >= 0:
+                # Push the farther child first so the nearer one is searched first
+                near, far = left[node], right[node]
+                if _box_gap(queries, i, lo, hi, far, metric) < _box_gap(queries, i, lo, hi, near, metric):
+                    near, far = far, near
+                stack[top], stack[top + 1] = far, near
+                top += 2
+                continue
+            for p in range(start[node], end[node]):
+                j = order[p]
+                count = _keep_nearest(best_idx, best_d, i, count, k, j,
+                                      _point_distance(queries, i, points, j, metric))
+    return best_idx, best_d
+
+@jit(nopython=True)
+def _kdtree_box(points, order, start, end, left, right, lo, hi, box_lo, box_hi):
+    offsets = np.zeros(len(box_lo) + 1, dtype=np.int64)
+    out = np.empty(max(16, len(box_lo)), dtype=np.int64)
+    stack = np.empty(len(start) + 1, dtype=np.int64)
+    d = points.shape[1]
+    size = 0
+    for i in range(len(box_lo)):
+        first = size
+        top = 0
+        if len(start) and end[0] > start[0]:
+            stack[0] = 0
+            top = 1
+        while top:
+            top -= 1
+            node = stack[top]
+            disjoint, inside = False, True
+            for k in range(d):
+                if hi[node, k] < box_lo[i, k] or lo[node, k] > box_hi[i, k]:
+                    disjoint = True
+                if lo[node, k] < box_lo[i, k] or hi[node, k] > box_hi[i, k]:
+                    inside = False
+            if disjoint:
+                continue
+            if left[node] >= 0 and not inside:
+                stack[top], stack[top + 1] = left[node], right[node]
+                top += 2
+                continue
+            for p in range(start[node], end[node]):
+                j = order[p]
+                keep = True
+                for k in range(d):
+                    if points[j, k] < box_lo[i, k] or points[j, k] > box_hi[i, k]:
+                        keep = False
+                if keep:
+                    out = _append(out, size, j)
+                    size += 1
+        out[first:size] = np.sort(out[first:size])
+        offsets[i + 1] = size
+    return offsets, out[:size]
+
+@jit(nopython=True)
+def _grid_candidates(cell_keys, cell_offsets, dims, strides, cell_lo, cell_hi, out):
+    """Positions (into the key-sorted point order) of every point whose cell
+    lies in the inclusive cell range [cell_lo, cell_hi]"""
+    d = len(dims)
+    lo = np.empty(d, dtype=np.int64)
+    hi = np.empty(d, dtype=np.int64)
+    for k in range(d):
+        lo[k] = max(cell_lo[k], 0)
+        hi[k] = min(cell_hi[k], dims[k] - 1)
+        if lo[k] > hi[k]:
+            return out, 0
+    cell = lo.copy()
+    size = 0
+    while True:
+        key = 0
+        for k in range(d):
+            key += cell[k] * strides[k]
+        c = np.searchsorted(cell_keys, key)
+        if c < len(cell_keys) and cell_keys[c] == key:
+            for p in range(cell_offsets[c], cell_offsets[c + 1]):
+                out = _append(out, size, p)
+                size += 1
+        k = d - 1
+        while k >= 0 and cell[k] == hi[k]:
+            cell[k] = lo[k]
+            k -= 1
+        if k < 0:
+            return out, size
+        cell[k] += 1
+
+@jit(nopython=True)
+def _grid_radius(points, order, cell_keys, cell_offsets, dims, strides, origin, cell_size,
+                 queries, radius, limit, metric):
+    offsets = np.zeros(len(queries) + 1, dtype=np.int64)
+    out = np.empty(max(16, len(queries)), dtype=np.int64)
+    candidates = np.empty(64, dtype=np.int64)
+    d = points.shape[1]
+    cell_lo = np.empty(d, dtype=np.int64)
+    cell_hi = np.empty(d, dtype=np.int64)
+    size = 0
+    for i in range(len(queries)):
+        first = size
+        for k in range(d):
+            cell_lo[k] = np.floor((queries[i, k] - radius - origin[k]) / cell_size)
+            cell_hi[k] = np.floor((queries[i, k] + radius - origin[k]) / cell_size)
+        candidates, count = _grid_candidates(cell_keys, cell_offsets, dims, strides,
+                                             cell_lo, cell_hi, candidates)
+        for c in range(count):
+            j = order[candidates[c]]
+            if _point_distance(queries, i, points, j, metric) <= limit:
+                out = _append(out, size, j)
+                size += 1
+        out[first:size] = np.sort(out[first:size])
+        offsets[i + 1] = size
+    return offsets, out[:size]
+
+@jit(nopython=True)
+def _grid_knn(points, order, cell_keys, cell_offsets, dims, strides, origin, cell_size,
+              queries, k, metric):
+    best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+    best_d = np.full((len(queries), k), np.inf)
+    candidates = np.empty(64, dtype=np.int64)
+    d = points.shape[1]
+    cell_lo = np.empty(d, dtype=np.int64)
+    cell_hi = np.empty(d, dtype=np.int64)
+    for i in range(len(queries)):
+        # Grow a box around the query until it holds k points within its
+        # half-width; every metric here is at least the Chebyshev distance,
+        # so nothing outside the box can be closer.
+        radius = cell_size
+        while True:
+            covers = True
+            for a in range(d):
+                cell_lo[a] = np.floor((queries[i, a] - radius - origin[a]) / cell_size)
+                cell_hi[a] = np.floor((queries[i, a] + radius - origin[a]) / cell_size)
+                if cell_lo[a] > 0 or cell_hi[a] < dims[a] - 1:
+                    covers = False
+            best_idx[i] = -1
+            best_d[i] = np.inf
+            candidates, count = _grid_candidates(cell_keys, cell_offsets, dims, strides,
+                                                 cell_lo, cell_hi, candidates)
+            found = 0
+            for c in range(count):
+                j = order[candidates[c]]
+                found = _keep_nearest(best_idx, best_d, i, found, k, j,
+                                      _point_distance(queries, i, points, j, metric))
+            bound = radius * radius if metric >= 2 else radius
+            if covers or (found == k and best_d[i, k - 1] <= bound):
+                break
+            radius *= 2
+    return best_idx, best_d
+
+@jit(nopython=True)
+def _grid_box(points, order, cell_keys, cell_offsets, dims, strides, origin, cell_size,
+              box_lo, box_hi):
+    offsets = np.zeros(len(box_lo) + 1, dtype=np.int64)
+    out = np.empty(max(16, len(box_lo)), dtype=np.int64)
+    candidates = np.empty(64, dtype=np.int64)
+    d = points.shape[1]
+    cell_lo = np.empty(d, dtype=np.int64)
+    cell_hi = np.empty(d, dtype=np.int64)
+    size = 0
+    for i in range(len(box_lo)):
+        first = size
+        for k in range(d):
+            cell_lo[k] = np.floor((box_lo[i, k] - origin[k]) / cell_size)
+            cell_hi[k] = np.floor((box_hi[i, k] - origin[k]) / cell_size)
+        candidates, count = _grid_candidates(cell_keys, cell_offsets, dims, strides,
+                                             cell_lo, cell_hi, candidates)
+        for c in range(count):
+            j = order[candidates[c]]
+            keep = True
+            for k in range(d):
+                if points[j, k] < box_lo[i, k] or points[j, k] > box_hi[i, k]:
+                    keep = False
+            if keep:
+                out = _append(out, size, j)
+                size += 1
+        out[first:size] = np.sort(out[first:size])
+        offsets[i + 1] = size
+    return offsets, out[:size]
+
+def _radius_limit(radius: float, metric: str) -> float:
+    """Radius in the units the kernels compare (squared for 'euclidean')"""
+    _metric_code(metric)
+    return float(radius) ** 2 if metric == 'euclidean' else float(radius)
+
+def _knn_result(best_idx: np.ndarray, best_d: np.ndarray, metric: str) -> Tuple[np.ndarray, np.ndarray]:
+    return best_idx, np.sqrt(best_d) if metric == 'euclidean' else best_d
+
+class KDTree:
+    """k-d tree over (n, d) points for batched radius, k-nearest and box queries
+
+    Nodes split at the median of their widest axis and keep a bounding box,
+    which bounds the distance to everything below them during queries.
+    Range queries return CSR-style `(offsets, indices)`: the matches of
+    query i are `indices[offsets[i]:offsets[i + 1]]`, sorted by index.
+    """
+    def __init__(self, points: np.ndarray, leaf_size: int = 16):
+        self.points = _point_array(points)
+        self.leaf_size = max(int(leaf_size), 1)
+        max_nodes = 2 * (len(self.points) // ((self.leaf_size + 1) // 2) + 1)
+        (self.order, self.start, self.end, self.left, self.right,
+         self.lo, self.hi) = _kdtree_build(self.points, self.leaf_size, max_nodes)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _tree(self) -> Tuple[np.ndarray, ...]:
+        return (self.points, self.order, self.start, self.end, self.left, self.right, self.lo, self.hi)
+
+    def query_radius(self, queries: np.ndarray, radius: float,
+                     metric: str = 'euclidean') -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of points within `radius` (inclusive) of each query"""
+        return _kdtree_radius(*self._tree(), _point_array(queries), _radius_limit(radius, metric),
+                              _metric_code(metric))
+
+    def query_knn(self, queries: np.ndarray, k: int = 1,
+                  metric: str = 'euclidean') -> Tuple[np.ndarray, np.ndarray]:
+        """(q, k) indices and distances of each query's k nearest points
+
+        Rows are sorted by distance, ties by index; missing neighbors (k
+        larger than the point count) are -1 / inf.
+        """
+        return _knn_result(*_kdtree_knn(*self._tree(), _point_array(queries), int(k),
+                                        _metric_code(metric)), metric)
+
+    def query_box(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of points inside each inclusive box [lo[i], hi[i]]"""
+        return _kdtree_box(*self._tree(), _point_array(lo), _point_array(hi))
+
+class GridIndex:
+    """Uniform-grid bucketing of (n, d) points, best for lattice points
+
+    Points are hashed to cells of side `cell_size` and sorted by cell, so a
+    query only scans the cells its range overlaps. Offers the same queries
+    as KDTree; the default cell size puts about two points in a cell of a
+    uniformly filled bounding box.
+    """
+    def __init__(self, points: np.ndarray, cell_size: Optional[float] = None):
+        self.points = _point_array(points)
+        n, d = self.points.shape
+        self.origin = self.points.min(axis=0) if n else np.zeros(d, dtype=self.points.dtype)
+        extent = (self.points.max(axis=0) - self.origin + 1) if n else np.ones(d)
+        if cell_size is None:
+            cell_size = max(1, int(np.ceil((np.prod(extent.astype(np.float64)) * 2 / max(n, 1)) ** (1 / d))))
+        self.cell_size = cell_size
+        cells = ((self.points - self.origin) // cell_size).astype(np.int64)
+        self.dims = (cells.max(axis=0) + 1) if n else np.ones(d, dtype=np.int64)
+        if np.prod(self.dims.astype(np.float64)) >= 2 ** 62:
+            raise ValueError("Too many grid cells; use a larger cell_size or a KDTree")
+        self.strides = np.concatenate([np.cumprod(self.dims[::-1])[::-1][1:], [1]]).astype(np.int64)
+        keys = cells @ self.strides
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, first = np.unique(keys[self.order], return_index=True)
+        self.cell_offsets = np.append(first, n).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _index(self) -> Tuple[Any, ...]:
+        return (self.points, self.order, self.cell_keys, self.cell_offsets, self.dims, self.strides,
+                self.origin.astype(np.float64), float(self.cell_size))
+
+    def query_radius(self, queries: np.ndarray, radius: float,
+                     metric: str = 'euclidean') -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of points within `radius` (inclusive) of each query"""
+        reach = float(radius) ** 0.5 if metric == 'sqeuclidean' else float(radius)
+        return _grid_radius(*self._index(), _point_array(queries), reach,
+                            _radius_limit(radius, metric), _metric_code(metric))
+
+    def query_knn(self, queries: np.ndarray, k: int = 1,
+                  metric: str = 'euclidean') -> Tuple[np.ndarray, np.ndarray]:
+        """(q, k) indices and distances of each query's k nearest points"""
+        return _knn_result(*_grid_knn(*self._index(), _point_array(queries), int(k),
+                                      _metric_code(metric)), metric)
+
+    def query_box(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of points inside each inclusive box [lo[i], hi[i]]"""
+        return _grid_box(*self._index(), _point_array(lo), _point_array(hi))
+
+class _UpperChain:
+    """Upper hull of a point set as x-sorted, block-backed coordinates
+
+    The lower hull is kept as the upper hull of (x, -y). Coordinates live
+    in a list of `array` blocks of at most 2 * LOAD points, located by
+    bisecting the blocks' first x values, so an accepted point costs
+    O(log h + LOAD) to place instead of shifting the whole chain. Points
+    strictly inside never touch storage, and each point is evicted at most
+    once when a newcomer makes its neighbors non-convex.
+    """
+    LOAD = 256
+
+    def __init__(self, typecode: str):
+        self.typecode = typecode
+        self.xs: List[pyarray.array] = []
+        self.ys: List[pyarray.array] = []
+        self.firsts: List[Any] = []
+        self._views = None
+
+    def _find(self, x: Any) -> Tuple[int, int]:
+        """(block, offset) of the first point with x' >= x; offset may be one past the last block"""
+        if not self.xs:
+            return 0, 0
+        b = max(bisect_right(self.firsts, x) - 1, 0)
+        j = bisect_left(self.xs[b], x)
+        if j == len(self.xs[b]) and b + 1 < len(self.xs):
+            return b + 1, 0
+        return b, j
+
+    def _step(self, position: Optional[Tuple[int, int]], delta: int) -> Optional[Tuple[int, int]]:
+        """Neighbor position one point left (-1) or right (+1), or None past either end"""
+        if position is None:
+            return None
+        b, j = position[0], position[1] + delta
+        if j < 0:
+            return (b - 1, len(self.xs[b - 1]) - 1) if b > 0 else None
+        if j >= len(self.xs[b]):
+            return (b + 1, 0) if b + 1 < len(self.xs) else None
+        return b, j
+
+    def _point(self, position: Tuple[int, int]) -> Tuple[Any, Any]:
+        b, j = position
+        return self.xs[b][j], self.ys[b][j]
+
+    def _delete(self, position: Tuple[int, int]):
+        b, j = position
+        del self.xs[b][j], self.ys[b][j]
+        if not self.xs[b]:
+            del self.xs[b], self.ys[b], self.firsts[b]
+        elif j == 0:
+            self.firsts[b] = self.xs[b][0]
+
+    @staticmethod
+    def _turn(a: Tuple[Any, Any], b: Tuple[Any, Any], c: Tuple[Any, Any]) -> Any:
+        """Cross product of (b - a) x (c - a); >= 0 means b is not above a-c"""
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    def insert(self, x: Any, y: Any) -> bool:
+        """Add a point; returns True if the chain changed"""
+        if not self.xs:
+            self.xs.append(pyarray.array(self.typecode, [x]))
+            self.ys.append(pyarray.array(self.typecode, [y]))
+            self.firsts.append(x)
+            self._views = None
+            return True
+        b, j = self._find(x)
+        if j < len(self.xs[b]) and self.xs[b][j] == x:
+            if self.ys[b][j] >= y:
+                return False
+            self.ys[b][j] = y
+        else:
+            left = self._step((b, j), -1)
+            if left is not None and j < len(self.xs[b]):
+                if self._turn(self._point(left), (x, y), self._point((b, j))) >= 0:
+                    return False
+            self.xs[b].insert(j, x)
+            self.ys[b].insert(j, y)
+            if j == 0:
+                self.firsts[b] = x
+            if len(self.xs[b]) > 2 * self.LOAD:
+                half = self.LOAD
+                self.xs.insert(b + 1, self.xs[b][half:])
+                self.ys.insert(b + 1, self.ys[b][half:])
+                del self.xs[b][half:], self.ys[b][half:]
+                self.firsts.insert(b + 1, self.xs[b + 1][0])
+        self._views = None
+
+        # Evict neighbors the new point makes non-convex; positions are
+        # re-found after each delete since blocks may shift or vanish
+        point = (x, y)
+        while True:
+            left = self._step(self._find(x), -1)
+            outer = self._step(left, -1)
+            if outer is None or self._turn(self._point(outer), self._point(left), point) < 0:
+                break
+            self._delete(left)
+        while True:
+            right = self._step(self._find(x), 1)
+            outer = self._step(right, 1)
+            if outer is None or self._turn(point, self._point(right), self._point(outer)) < 0:
+                break
+            self._delete(right)
+        return True
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Read-only NumPy copies of the chain, rebuilt only after it changes"""
+        if self._views is None:
+            dtype = np.int64 if self.typecode == 'q' else np.float64
+            views = []
+            for blocks in (self.xs, self.ys):
+                flat = np.concatenate([np.frombuffer(block, dtype=dtype) for block in blocks] or
+                                      [np.zeros(0, dtype=dtype)])
+                flat.flags.writeable = False
+                views.append(flat)
+            self._views = tuple(views)
+        return self._views
+
+    def below(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """Mask of points on or under the chain, within its x-range"""
+        xs, ys = self.arrays()
+        if not len(xs):
+            return np.zeros(len(px), dtype=bool)
+        i = np.searchsorted(xs, px)
+        inside = (px >= xs[0]) & (px <= xs[-1])
+        hi = np.minimum(i, len(xs) - 1)
+        lo = np.maximum(hi - 1, 0)
+        exact = xs[hi] == px
+        turn = (xs[hi] - xs[lo]) * (py - ys[lo]) - (ys[hi] - ys[lo]) * (px - xs[lo])
+        return inside & np.where(exact, py <= ys[hi], turn <= 0)
+
+class IncrementalHull:
+    """2D convex hull that grows as points are added
+
+    Keeps upper and lower monotone chains in blocked `array` storage, so
+    adding a point costs O(log h + block size) plus amortized O(1)
+    evictions for h hull vertices, and area, perimeter and containment
+    read the chains as cached NumPy arrays. Collinear boundary points are
+    dropped. Use `Geometry.convex_hull` for N-D or
+    one-off batch hulls.
+    """
+    def __init__(self, points: Optional[np.ndarray] = None, integer: Optional[bool] = None):
+        if integer is None:
+            integer = points is not None and np.asarray(points).dtype.kind in 'biu'
+        self._typecode = 'q' if integer else 'd'
+        self._upper = _UpperChain(self._typecode)
+        self._lower = _UpperChain(self._typecode)
+        self._vertices = None
+        if points is not None:
+            self.update(points)
+
+    def _coerce(self, value: Any) -> Any:
+        return int(value) if self._typecode == 'q' else float(value)
+
+    def add(self, x: float, y: float) -> bool:
+        """Insert one point; returns True if the hull changed"""
+        x, y = self._coerce(x), self._coerce(y)
+        changed = self._upper.insert(x, y)
+        changed = self._lower.insert(x, -y) or changed
+        if changed:
+            self._vertices = None
+        return changed
+
+    def update(self, points: np.ndarray) -> int:
+        """Insert a batch of (n, 2) points; returns how many changed the hull
+
+        Points already inside the hull are filtered out in one vectorized
+        containment test before any insertion.
+        """
+        points = np.asarray(points).reshape(-1, 2)
+        if len(self):
+            points = points[~self.contains(points)]
+        return sum(self.add(x, y) for x, y in points.tolist())
+
+    def vertices(self) -> np.ndarray:
+        """(k, 2) hull vertices in counter-clockwise order from the leftmost-lowest"""
+        if self._vertices is None:
+            lx, ly = self._lower.arrays()
+            ux, uy = self._upper.arrays()
+            lower = np.column_stack([lx, -ly])
+            upper = np.column_stack([ux, uy])[::-1]
+            if len(upper) and len(lower) and (upper[0] == lower[-1]).all():
+                upper = upper[1:]
+            if len(upper) and len(lower) and (upper[-1] == lower[0]).all():
+                upper = upper[:-1]
+            self._vertices = np.concatenate([lower, upper])
+            self._vertices.flags.writeable = False
+        return self._vertices
+
+    def __len__(self) -> int:
+        return len(self.vertices())
+
+    def area(self) -> float:
+        """Enclosed area (shoelace formula)"""
+        v = self.vertices().astype(np.float64)
+        if len(v) < 3:
+            return 0.0
+        x, y = v[:, 0], v[:, 1]
+        return float(abs(x @ np.roll(y, -1) - y @ np.roll(x, -1)) / 2)
+
+    def perimeter(self) -> float:
+        """Length of the closed boundary"""
+        v = self.vertices().astype(np.float64)
+        if len(v) < 2:
+            return 0.0
+        return float(np.hypot(*(np.roll(v, -1, axis=0) - v).T).sum())
+
+    def contains(self, points: np.ndarray) -> Union[bool, np.ndarray]:
+        """Whether points lie inside or on the hull (a bool for one point)"""
+        array = np.asarray(points)
+        flat = array.reshape(-1, 2)
+        px, py = flat[:, 0], flat[:, 1]
+        result = self._upper.below(px, py) & self._lower.below(px, -py)
+        return bool(result[0]) if array.ndim == 1 else result
+
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+def _as_bytes_array(text: Union[str, bytes, np.ndarray]) -> np.ndarray:
+    """Flat uint8 view of text (encoded once if it is a str)"""
+    if isinstance(text, np.ndarray):
+        return text.reshape(-1).view(np.uint8)
+    if isinstance(text, str):
+        text = text.encode()
+    return np.frombuffer(text, dtype=np.uint8)
+
+def _split_chunks(data: np.ndarray, chunk_size: int) -> List[Tuple[int, int]]:
+    """(start, stop) offsets of roughly chunk_size pieces, cut just after a newline"""
+    bounds = []
+    start, size = 0, data.size
+    while start < size:
+        stop = min(start + chunk_size, size)
+        if stop < size:
+            newline = np.flatnonzero(data[stop:stop + 4096] == ord('\n'))
+            while not newline.size and stop < size:
+                stop = min(stop + 4096, size)
+                newline = np.flatnonzero(data[stop:stop + 4096] == ord('\n'))
+            stop = min(stop + int(newline[0]) + 1, size) if newline.size else size
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+def _int_tokens(data: np.ndarray, negative: bool = True) -> np.ndarray:
+    """Values of all digit runs in a uint8 buffer, in order, as int64
+
+    Runs of 19 or more digits (leading zeros included) could overflow the
+    vectorized sum and are converted one by one instead; a magnitude that
+    does not fit in int64 raises ValueError.
+    """
+    is_digit = (data >= ord('0')) & (data <= ord('9'))
+    positions = np.flatnonzero(is_digit)
+    if not positions.size:
+        return np.zeros(0, dtype=np.int64)
+    # A new number starts wherever a digit does not directly follow another
+    starts = np.ones(positions.size, dtype=bool)
+    starts[1:] = positions[1:] != positions[:-1] + 1
+    first = np.flatnonzero(starts)
+    lengths = np.diff(np.append(first, positions.size))
+    last_position = positions[np.append(first[1:], positions.size) - 1]
+    exponents = np.repeat(last_position, lengths) - positions
+    long_runs = np.flatnonzero(lengths >= _POWERS_OF_TEN.size)
+    if long_runs.size:
+        # Placeholder powers only; these runs are overwritten below
+        np.minimum(exponents, _POWERS_OF_TEN.size - 1, out=exponents)
+    digits = (data[positions] - ord('0')).astype(np.int64)
+    values = np.add.reduceat(digits * _POWERS_OF_TEN[exponents], first)
+    for run in long_runs.tolist():
+        start = positions[first[run]]
+        text = data[start:start + lengths[run]].tobytes()
+        value = int(text)
+        if value > np.iinfo(np.int64).max:
+            raise ValueError(f"Integer {text.decode()} does not fit in int64")
+        values[run] = value
+    if negative:
+        before = positions[first] - 1
+        signed = before >= 0
+        signed[signed] = data[before[signed]] == ord('-')
+        values[signed] *= -1
+    return values
+
+_ROW_PADDING = np.frombuffer(b' \t\r\x0b\x0c', dtype=np.uint8)
+_CACHED_PARSE_KINDS = ('load_grid', 'parse_grid', 'int_columns', 'parse_records')
+_PARALLEL_PARSE_KINDS = ('lines', 'numbers', 'int_columns', 'parse_with_regex')
+_processor: Optional[ParallelProcessor] = None
+
+def _default_processor() -> ParallelProcessor:
+    """Lazily created warm pool shared by parallel parsing and pattern matching"""
+    global _processor
+    if _processor is None:
+        _processor = ParallelProcessor(persistent=True)
+    return _processor
+
+def _parse_chunk(task: Tuple[str, int, int, str, bool, bool, Dict[str, Any]]) -> Union[List[Any], np.ndarray]:
+    """Worker-side: parse one newline-aligned byte range of a file"""
+    path, start, stop, kind, strip, filter_empty, options = task
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        raw = mm[start:stop]
+    if kind == 'int_columns':
+        return _int_tokens(np.frombuffer(raw, dtype=np.uint8), options.get('negative', True))
+    parser = Parser(strip, filter_empty)
+    return getattr(parser, kind)(raw.decode(), **options)
+
+class ParseCache:
+    """On-disk cache of parsed inputs, stored as .npy and loaded memory-mapped
+
+    Entries are keyed by a content hash of the input file plus the parse
+    kind and options, so editing an input or changing options never serves
+    stale data. File hashes are memoized by (size, mtime) so warm runs do
+    not even re-read the input. Least recently used entries are evicted
+    once the cache grows past `max_bytes`.
+    """
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = 1 << 30):
+        self.directory = Path(directory or Path(__file__).parent.parent / '.parse_cache')
+        self.max_bytes = max_bytes
+        self._hashes_path = self.directory / 'hashes.json'
+
+    def file_digest(self, path: Path) -> str:
+        """Content hash of a file, recomputed only when its size or mtime changes"""
+        path = Path(path).resolve()
+        stat = path.stat()
+        try:
+            hashes = json.loads(self._hashes_path.read_text())
+        except (OSError, ValueError):
+            hashes = {}
+        known = hashes.get(str(path))
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        hashes[str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._atomic_write(self._hashes_path, json.dumps(hashes).encode())
+        return digest.hexdigest()
+
+    def entry(self, path: Path, kind: str, options: Dict[str, Any]) -> Path:
+        """Directory holding the cached result for an input and parse options"""
+        described = repr((kind, sorted(options.items(), key=lambda item: item[0])))
+        option_hash = hashlib.blake2b(described.encode(), digest_size=8).hexdigest()
+        return self.directory / f'{self.file_digest(path)}-{option_hash}'
+
+    def load(self, entry: Path) -> Union[np.ndarray, Dict[str, np.ndarray], None]:
+        """Memory-map a cached result, or None if it is not cached"""
+        try:
+            fields = json.loads((entry / 'fields.json').read_text())
+        except (OSError, ValueError):
+            return None
+        os.utime(entry)  # mark as recently used
+        arrays = {name: np.load(entry / f'{i}.npy', mmap_mode='r') for i, name in enumerate(fields)}
+        return arrays[None] if fields == [None] else arrays
+
+    def store(self, entry: Path, result: Union[np.ndarray, Dict[str, np.ndarray]]):
+        """Write a result (an array or a dict of arrays), then enforce the size limit"""
+        arrays = {None: result} if isinstance(result, np.ndarray) else result
+        staging = entry.with_name(entry.name + f'.tmp{os.getpid()}')
+        staging.mkdir(parents=True, exist_ok=True)
+        for i, array in enumerate(arrays.values()):
+            np.save(staging / f'{i}.npy', np.ascontiguousarray(array))
+        (staging / 'fields.json').write_text(json.dumps(list(arrays)))
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)  # another process won the race
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = [(e.stat().st_mtime, sum(f.stat().st_size for f in e.iterdir()), e)
+                   for e in self.directory.iterdir() if e.is_dir() and '.tmp' not in e.name]
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every cached entry and memoized hash"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        staging = path.with_name(path.name + f'.tmp{os.getpid()}')
+        staging.write_bytes(data)
+        os.replace(staging, path)
+
+_parse_cache: Optional[ParseCache] = None
+
+def _default_parse_cache() -> ParseCache:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
+
 class Parser:
     """Robust input parsing with multiple formats and validation"""
+    REGEX_CACHE_SIZE = 128
     
     def __init__(self, strip: bool = True, filter_empty: bool = True):
         self.strip = strip
         self.filter_empty = filter_empty
-        self._regex_cache: Dict[str, Pattern] = {}
+        self._regex_cache: 'OrderedDict[Tuple[str, int], Pattern]' = OrderedDict()
+
+    def _compile(self, pattern: str, flags: int = 0) -> Pattern:
+        """Compile through a bounded LRU cache keyed by (pattern, flags)"""
+        key = (pattern, flags)
+        regex = self._regex_cache.get(key)
+        if regex is None:
+            regex = self._regex_cache[key] = re.compile(pattern, flags)
+            if len(self._regex_cache) > self.REGEX_CACHE_SIZE:
+                self._regex_cache.popitem(last=False)
+        else:
+            self._regex_cache.move_to_end(key)
+        return regex
     
-    def load_file(self, day: Union[int, str]) -> str:
+    @staticmethod
+    def input_path(day: Union[int, str, Path]) -> Path:
+        """Path of the input for a day: Data/0N.txt, falling back to Data/N.txt"""
+        if isinstance(day, Path):
+            return day
+        data = Path(__file__).parent.parent / 'Data'
+        padded = data / f'{str(day).zfill(2)}.txt'
+        plain = data / f'{day}.txt'
+        return plain if not padded.exists() and plain.exists() else padded
+
+    def load_file(self, day: Union[int, str, Path]) -> str:
         """Load input file for given day"""
-        day = str(day).zfill(2)
-        path = Path(__file__).parent.parent / 'Data' / f'{day}.txt'
+        path = self.input_path(day)
         return path.read_text().strip() if self.strip else path.read_text()
 
+    def load_grid(self,
+                  day: Union[int, str, Path],
+                  translate: Union[Dict[str, int], str, np.ndarray, None] = None) -> np.ndarray:
+        """Memory-map a day's input as a read-only (rows, cols) uint8 grid
+
+        No bytes are copied: the file is viewed with a row stride that steps
+        over the newline column. With `translate` the bytes are mapped to
+        small-int codes instead (one copy, still 1 byte per cell).
+        """
+        path = self.input_path(day)
+        if path.stat().st_size == 0:
+            grid = np.zeros((0, 0), dtype=np.uint8)
+        else:
+            with open(path, 'rb') as f:
+                # The array keeps the mapping alive after the file is closed
+                grid = self._grid_view(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return grid if translate is None else self.translate_grid(grid, translate)
+
+    @staticmethod
+    def _grid_view(buffer: Union[bytes, mmap.mmap]) -> np.ndarray:
+        """View newline-separated equal-width rows of a byte buffer as a 2D array"""
+        size = len(buffer)
+        # Only line breaks are trimmed; trailing spaces may be grid cells
+        while size and buffer[size - 1] in b'\r\n':
+            size -= 1
+        if not size:
+            return np.zeros((0, 0), dtype=np.uint8)
+        cols = buffer.find(b'\n', 0, size)
+        if cols < 0:
+            cols = size
+        stride = cols + 1
+        if cols and buffer[cols - 1] == ord('\r'):
+            cols -= 1
+        if (size - cols) % stride:
+            raise ValueError("Grid rows must all have the same width")
+        rows = (size - cols) // stride + 1
+        data = np.frombuffer(buffer, dtype=np.uint8, count=size)
+        if rows > 1:
+            separators = np.lib.stride_tricks.as_strided(
+                data[stride - 1:], shape=(rows - 1,), strides=(stride,), writeable=False)
+            if (separators != ord('\n')).any():
+                raise ValueError("Grid rows must all have the same width")
+        return np.lib.stride_tricks.as_strided(
+            data, shape=(rows, cols), strides=(stride, 1), writeable=False)
+
+    @staticmethod
+    def translation_table(mapping: Union[Dict[str, int], str]) -> np.ndarray:
+        """256-entry lookup table from {char: code}, or a string where code = position
+
+        Unmapped bytes get 255.
+        """
+        if isinstance(mapping, str):
+            mapping = {char: code for code, char in enumerate(mapping)}
+        table = np.full(256, 255, dtype=np.uint8)
+        for char, code in mapping.items():
+            table[ord(char)] = code
+        return table
+
+    def translate_grid(self,
+                       grid: np.ndarray,
+                       translate: Union[Dict[str, int], str, np.ndarray]) -> np.ndarray:
+        """Map a uint8 grid to small-int codes through a translation table"""
+        table = translate if isinstance(translate, np.ndarray) else self.translation_table(translate)
+        codes = table[grid]
+        if (table == 255).any() and (codes == 255).any():
+            unknown = sorted({chr(b) for b in np.unique(grid[codes == 255]).tolist()})
+            raise ValueError(f"No translation for characters: {unknown}")
+        return codes
+
+    def open_input(self, source: Union[int, str, Path, BinaryIO]) -> BinaryIO:
+        """Open a day's input (or a path / binary file) for streaming reads
+
+        Gzip and zstd files are decompressed transparently, detected by
+        their magic bytes; `Data/N.txt.gz` / `.zst` are used when the plain
+        file is missing. zstd needs the optional `zstandard` package.
+        """
+        if hasattr(source, 'read'):
+            return source
+        path = self.input_path(source)
+        if not path.exists():
+            for suffix in ('.gz', '.zst'):
+                if path.with_name(path.name + suffix).exists():
+                    path = path.with_name(path.name + suffix)
+                    break
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+        if magic[:2] == b'\x1f\x8b':
+            return gzip.open(path, 'rb')
+        if magic == b'\x28\xb5\x2f\xfd':
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError(f"Reading {path} needs the 'zstandard' package") from e
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return open(path, 'rb')
+
+    def _reading(self, source: Union[int, str, Path, BinaryIO]) -> ContextManager[BinaryIO]:
+        """`open_input` as a context manager that leaves caller-supplied streams open"""
+        if hasattr(source, 'read'):
+            return contextlib.nullcontext(source)
+        return self.open_input(source)
+
+    def iter_lines(self,
+                   source: Union[int, str, Path, BinaryIO],
+                   chunk_size: int = 1 << 20,
+                   encoding: Optional[str] = 'utf-8') -> Iterator[Union[str, bytes]]:
+        """Stream lines of an input in constant memory
+
+        Reads fixed-size chunks and carries partial lines across chunk
+        boundaries, applying the parser's strip / filter_empty settings.
+        Yields bytes when `encoding` is None.
+        """
+        with self._reading(source) as f:
+            tail = b''
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                pieces = (tail + chunk).split(b'\n')
+                tail = pieces.pop()
+                for piece in pieces:
+                    line = self._finish_line(piece, encoding)
+                    if line is not None:
+                        yield line
+            if tail:
+                line = self._finish_line(tail, encoding)
+                if line is not None:
+                    yield line
+
+    def _finish_line(self, raw: bytes, encoding: Optional[str]) -> Union[str, bytes, None]:
+        """Apply strip / filter_empty to one raw line; None means skip it"""
+        raw = raw.strip() if self.strip else raw.rstrip(b'\r')
+        if self.filter_empty and not raw:
+            return None
+        return raw if encoding is None else raw.decode(encoding)
+
+    def iter_records(self,
+                     source: Union[int, str, Path, BinaryIO],
+                     parse: Union[str, Callable[[str], T]],
+                     as_dict: bool = True,
+                     chunk_size: int = 1 << 20) -> Iterator[Union[T, Dict[str, str], tuple]]:
+        """Stream one parsed record per line
+
+        `parse` is either a callable applied to each line or a regex whose
+        match yields a groupdict (or groups tuple); lines it does not match
+        are skipped.
+        """
+        if callable(parse):
+            for line in self.iter_lines(source, chunk_size):
+                yield parse(line)
+            return
+        regex = self._compile(parse)
+        for line in self.iter_lines(source, chunk_size):
+            match = regex.search(line)
+            if match:
+                yield match.groupdict() if as_dict else match.groups()
+
+    def load_cached(self,
+                    day: Union[int, str, Path],
+                    kind: str,
+                    cache: Optional[ParseCache] = None,
+                    **options) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """Parse a day's input once and reuse the binary result on later runs
+
+        `kind` is 'load_grid', 'parse_grid', 'int_columns' or
+        'parse_records' (columnar results are cached too); `options` are
+        passed to that method and are part of the cache key. Cached results
+        come back as read-only memory-mapped arrays.
+        """
+        if kind not in _CACHED_PARSE_KINDS:
+            raise ValueError(f"Unsupported cached parse kind: {kind!r}")
+        cache = cache or _default_parse_cache()
+        path = self.input_path(day)
+        entry = cache.entry(path, kind, {**options, 'strip': self.strip,
+                                         'filter_empty': self.filter_empty})
+        result = cache.load(entry)
+        if result is None:
+            if kind == 'load_grid':
+                result = self.load_grid(path, **options)
+            elif kind == 'int_columns':
+                result = self.int_columns(self.load_bytes(path), **options)
+            else:
+                result = getattr(self, kind)(self.load_file(path), **options)
+            cache.store(entry, result)
+        return result
+
     def lines(self, text: str) -> List[str]:
         """Split text into lines with optional filtering"""
         lines = text.splitlines()
@@ -221,11 +3120,116 @@ class Parser:
         pattern = r'-?\d+\.?\d*' if negative else r'\d+\.?\d*'
         return [as_type(n) for n in re.findall(pattern, text)]
 
+    def load_bytes(self, day: Union[int, str, Path]) -> np.ndarray:
+        """Memory-map a day's input as a read-only flat uint8 array (no copy)"""
+        path = self.input_path(day)
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        with open(path, 'rb') as f:
+            return np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), dtype=np.uint8)
+
+    def int_columns(self,
+                    text: Union[str, bytes, np.ndarray],
+                    ncols: int,
+                    negative: bool = True,
+                    chunk_size: int = 1 << 20) -> np.ndarray:
+        """Extract every integer into an int64 array of shape (n, ncols)
+
+        Works on the raw bytes with array operations only: digit runs are
+        located with shifted masks and their values summed from per-digit
+        powers of ten, so no str or int object is created per number. Input
+        is processed in newline-aligned chunks to bound temporaries. Values
+        whose magnitude does not fit in int64 raise ValueError.
+        """
+        data = _as_bytes_array(text)
+        parts = [_int_tokens(data[lo:hi], negative) for lo, hi in _split_chunks(data, chunk_size)]
+        values = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        if values.size % ncols:
+            raise ValueError(f"Found {values.size} integers, not a multiple of {ncols} columns")
+        return values.reshape(-1, ncols)
+
+    def iter_int_columns(self,
+                         source: Union[int, str, Path, BinaryIO],
+                         ncols: int,
+                         negative: bool = True,
+                         chunk_size: int = 1 << 26) -> Iterator[np.ndarray]:
+        """Stream `int_columns` over an input in newline-aligned blocks
+
+        Yields (m, ncols) int64 arrays in file order while holding only
+        about `chunk_size` bytes at a time; compressed inputs are read
+        through `open_input`. Rows must not span lines.
+        """
+        with self._reading(source) as f:
+            tail = b''
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                cut = chunk.rfind(b'\n') + 1
+                if not cut:
+                    tail += chunk
+                    continue
+                block, tail = tail + chunk[:cut], chunk[cut:]
+                yield self.int_columns(block, ncols, negative)
+            if tail:
+                yield self.int_columns(tail, ncols, negative)
+
+    def parallel_parse(self,
+                       source: Union[int, str, Path],
+                       kind: str = 'lines',
+                       processor: Optional[ParallelProcessor] = None,
+                       chunk_size: Optional[int] = None,
+                       **options) -> Union[List[Any], np.ndarray]:
+        """Parse a large plain-text input across worker processes
+
+        `kind` is 'lines', 'numbers', 'int_columns' (pass `ncols`) or
+        'parse_with_regex' (pass `pattern`); other options go to that
+        method. The file is memory-mapped and cut at newline-aligned byte
+        offsets; each worker maps the same file and parses only its slice,
+        and results are concatenated in file order. Tokens and regex
+        matches must therefore not span lines.
+        """
+        if kind not in _PARALLEL_PARSE_KINDS:
+            raise ValueError(f"Unsupported parallel parse kind: {kind!r}")
+        path = self.input_path(source)
+        data = self.load_bytes(path)
+        proc = processor or _default_processor()
+        chunk_size = chunk_size or max(1 << 20, -(-data.size // (4 * proc.max_workers)))
+        ncols = options.pop('ncols', None) if kind == 'int_columns' else None
+        if kind == 'int_columns' and not ncols:
+            raise ValueError("int_columns needs ncols")
+        tasks = [(str(path), start, stop, kind, self.strip, self.filter_empty, options)
+                 for start, stop in _split_chunks(data, chunk_size)]
+        # No `with` here: that would tear down a caller's non-persistent pool
+        parts = proc.map(_parse_chunk, tasks, chunk_size=1)
+        if kind != 'int_columns':
+            return list(itertools.chain.from_iterable(parts))
+        values = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        if values.size % ncols:
+            raise ValueError(f"Found {values.size} integers, not a multiple of {ncols} columns")
+        return values.reshape(-1, ncols)
+
     def parse_grid(self, 
                   text: str, 
                   as_type: type = str,
-                  separator: str = '') -> np.ndarray:
-        """Parse 2D grid from text"""
+                  separator: str = '',
+                  translate: Union[Dict[str, int], str, np.ndarray, None] = None) -> np.ndarray:
+        """Parse 2D grid from text
+
+        With `as_type=np.uint8` or a `translate` table, equal-width character
+        grids take a fast path: one encode, then a strided byte view
+        (translated to codes if requested) instead of per-cell strings.
+        Rows are stripped and filtered as in `lines`; only grids whose row
+        edges hold whitespace pay for that extra split.
+        """
+        if not separator and (translate is not None or as_type is np.uint8):
+            try:
+                grid = self._grid_view(text.strip().encode()) if self.strip else None
+            except ValueError:
+                grid = None
+            if grid is None or (grid.size and np.isin(grid[:, [0, -1]], _ROW_PADDING).any()):
+                grid = self._grid_view('\n'.join(self.lines(text)).encode())
+            return grid if translate is None else self.translate_grid(grid, translate)
         lines = self.lines(text)
         if separator:
             grid = [line.split(separator) for line in lines]
@@ -257,16 +3261,55 @@ class Parser:
         Parse text using regex pattern
         Returns list of dicts (if named groups) or tuples (if unnamed groups)
         """
-        if pattern not in self._regex_cache:
-            self._regex_cache[pattern] = re.compile(pattern, flags)
-            
-        regex = self._regex_cache[pattern]
+        regex = self._compile(pattern, flags)
         matches = regex.finditer(text)
         
         if as_dict:
             return [m.groupdict() for m in matches]
         return [m.groups() for m in matches]
 
+    def parse_records(self,
+                      text: str,
+                      pattern: str,
+                      schema: Dict[str, Union[type, str, np.dtype]],
+                      columnar: bool = False,
+                      flags: int = re.MULTILINE) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Parse every match of pattern into typed columns
+        Returns a structured array (or {field: array} if columnar)
+
+        `schema` maps field names to types (int, float, str or NumPy dtypes).
+        Fields are named groups of the pattern, or taken in group order when
+        the pattern has unnamed groups. Matches come back as plain tuples and
+        each column is converted in a single array construction, so no dict
+        is built per record, e.g.
+        `parse_records(text, r'p=(-?\d+),(-?\d+) v=(-?\d+),(-?\d+)',
+        {'x': int, 'y': int, 'dx': int, 'dy': int})`.
+        """
+        regex = self._compile(pattern, flags)
+        if regex.groups < len(schema):
+            raise ValueError(f"Pattern has {regex.groups} groups but schema has {len(schema)} fields")
+        width = regex.groups
+        matches = regex.findall(text)
+        # One flat list of group strings; column g is every width-th entry
+        fields = matches if width == 1 else list(itertools.chain.from_iterable(matches))
+        count = len(fields) // width
+
+        columns = {}
+        for position, (name, kind) in enumerate(schema.items()):
+            group = regex.groupindex.get(name, position + 1) - 1
+            dtype = np.dtype({int: np.int64, float: np.float64, str: np.str_}.get(kind, kind))
+            try:
+                columns[name] = np.array(fields[group::width], dtype=dtype).reshape(count)
+            except ValueError as e:
+                raise ValueError(f"Could not parse field {name!r} as {dtype}: {e}")
+        if columnar:
+            return columns
+        records = np.empty(count, dtype=[(name, col.dtype) for name, col in columns.items()])
+        for name, col in columns.items():
+            records[name] = col
+        return records
+
     def parse_key_value(self, 
                        text: str,
                        item_sep: str = '\n',